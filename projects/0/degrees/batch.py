@@ -0,0 +1,211 @@
+import csv
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+from util import breadth_first_search, path_to
+
+# Sources with at least this many targets share one BFS over the graph
+SHARED_SEARCH_TARGETS = 8
+
+
+def search_from(source, targets=None):
+    """
+    Runs a single BFS from a source person_id that serves every target.
+
+    Returns (parents, distances) keyed by person_id, or by person index
+    with the "csr" backend, together with a function converting a target
+    person_id to its (movie_id, person_id) path.
+    """
+    graph = degrees.graph
+    if graph is None:
+        parents, distances = breadth_first_search(
+            source, degrees.neighbors_for_person, targets
+        )
+        return parents, distances, lambda target: path_to(parents, target)
+
+    if targets is not None:
+        targets = [graph.person_index[target] for target in targets]
+    parents, distances = breadth_first_search(
+        graph.person_index[source], graph.neighbors, targets
+    )
+    return parents, distances, lambda target: graph.path_ids(
+        path_to(parents, graph.person_index[target])
+    )
+
+
+def paths_from(source, targets):
+    """
+    Returns a list of (source, target, path) for every target, where path
+    is a list of (movie_id, person_id) pairs, or None if not connected.
+    """
+    # A bidirectional search is much cheaper than a full BFS from
+    # the source when there are only a few targets to serve
+    if len(targets) < SHARED_SEARCH_TARGETS:
+        return [(source, target, degrees.shortest_path(source, target))
+                for target in targets]
+    _, _, path = search_from(source, targets)
+    return [(source, target, path(target)) for target in targets]
+
+
+def distances_from(source):
+    """
+    Returns a dict mapping every person_id connected to source
+    to their degrees of separation from source, and a function
+    converting one of them to its (movie_id, person_id) path,
+    reconstructed from the parents found by the same search.
+    """
+    _, distances, path = search_from(source)
+    graph = degrees.graph
+    if graph is None:
+        return distances, path
+    return {graph.person_ids[person]: distance
+            for person, distance in distances.items()}, path
+
+
+def init_worker(directory, backend):
+    """
+    Loads the graph in a pool worker, unless it was inherited from the
+    parent process by fork.
+    """
+    if degrees.graph is None and not degrees.people:
+        degrees.load_data(directory, backend)
+
+
+def run_source(task):
+    source, targets = task
+    return paths_from(source, targets)
+
+
+def batch_paths(pairs, workers=1, directory=None, backend="dict"):
+    """
+    Returns a list of (source, target, path) for every (source, target)
+    pair, in the order given.
+
+    Pairs are grouped by source so that each source runs a single BFS.
+    With the "csr" backend, sources are spread across a pool of worker
+    processes that share the memory-mapped snapshot pages: inherited
+    from this process where fork is available, otherwise loaded again
+    from directory. The "dict" backend runs every source in this
+    process, since forked workers would copy its pages as soon as they
+    touched the reference counts of its objects.
+    """
+    tasks = {}
+    for source, target in pairs:
+        tasks.setdefault(source, []).append(target)
+
+    if workers <= 1 or len(tasks) == 1 or backend != "csr":
+        results = [run_source(task) for task in tasks.items()]
+    else:
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context,
+            initializer=init_worker, initargs=(directory, backend)
+        ) as pool:
+            results = list(pool.map(run_source, tasks.items(),
+                                    chunksize=chunksize))
+
+    paths = {}
+    for result in results:
+        for source, target, path in result:
+            paths[(source, target)] = path
+    return [(source, target, paths[(source, target)])
+            for source, target in pairs]
+
+
+def resolve(person):
+    """
+    Returns the person_id for a person_id or an unambiguous name.
+
+    Raises ValueError if no person or several people have the name.
+    """
+    if person in degrees.people:
+        return person
+    person_ids = degrees.names.get(person.lower(), set())
+    if len(person_ids) != 1:
+        raise ValueError(f"Person not found or ambiguous: {person}")
+    return next(iter(person_ids))
+
+
+def read_pairs(filename):
+    """
+    Reads (source, target) pairs of person_ids or names, one pair per
+    line separated by a comma or tab.
+    """
+    pairs = []
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            source, target = line.split("\t" if "\t" in line else ",")
+            pairs.append((resolve(source.strip()), resolve(target.strip())))
+    return pairs
+
+
+def format_path(path):
+    if path is None:
+        return ""
+    return " ".join(f"{movie_id}:{person_id}" for movie_id, person_id in path)
+
+
+def main():
+    usage = ("Usage: python batch.py [--csr] [--workers N] directory "
+             "(--pairs FILE | --source PERSON)")
+    args = sys.argv[1:]
+    backend = "dict"
+    workers = os.cpu_count() or 1
+    pairs_file = source = directory = None
+    while args:
+        arg = args.pop(0)
+        if arg == "--csr":
+            backend = "csr"
+        elif arg == "--workers" and args:
+            workers = int(args.pop(0))
+        elif arg == "--pairs" and args:
+            pairs_file = args.pop(0)
+        elif arg == "--source" and args:
+            source = args.pop(0)
+        elif directory is None and not arg.startswith("--"):
+            directory = arg
+        else:
+            sys.exit(usage)
+    if directory is None or (pairs_file is None) == (source is None):
+        sys.exit(usage)
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, backend)
+    print("Data loaded.", file=sys.stderr)
+
+    try:
+        if source is not None:
+            source = resolve(source)
+        else:
+            pairs = read_pairs(pairs_file)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["source", "target", "degrees", "path"])
+    if source is not None:
+        distances, path = distances_from(source)
+        for target, distance in sorted(distances.items(),
+                                       key=lambda item: item[1]):
+            writer.writerow([source, target, distance,
+                             format_path(path(target))])
+    else:
+        for source, target, path in batch_paths(pairs, workers,
+                                                directory, backend):
+            writer.writerow([source, target,
+                             "" if path is None else len(path),
+                             format_path(path)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import degrees
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
+
+
+def unidirectional_path(source, target):
+    """
+    Reference one-directional BFS over the same neighbors, used as the
+    baseline that shortest_path is compared against.
+    """
+    if source == target:
+        return []
+    parents = {source: None}
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person_id in frontier:
+            neighbors = degrees.neighbors_for_person(person_id)
+            for movie_id, neighbor_id in neighbors:
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                if neighbor_id == target:
+                    path = []
+                    while parents[neighbor_id] is not None:
+                        movie_id, previous_id = parents[neighbor_id]
+                        path.append((movie_id, neighbor_id))
+                        neighbor_id = previous_id
+                    return path[::-1]
+                next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return None
+
+
+def random_pairs(count, seed=0):
+    """
+    Returns count random (source, target) pairs of people who starred
+    in at least one movie.
+    """
+    rng = random.Random(seed)
+    actors = sorted(
+        person_id for person_id, person in degrees.people.items()
+        if person["movies"]
+    )
+    return [(rng.choice(actors), rng.choice(actors)) for _ in range(count)]
+
+
+def valid_path(source, target, path):
+    """
+    Checks that consecutive people of a path starred in its movies.
+    """
+    if path is None:
+        return True
+    person_id = source
+    for movie_id, next_id in path:
+        stars = degrees.movies[movie_id]["stars"]
+        if person_id not in stars or next_id not in stars:
+            return False
+        person_id = next_id
+    return person_id == target
+
+
+def time_queries(search, pairs):
+    """
+    Runs search over every pair, returning the list of path lengths
+    and the per-query latencies in seconds.
+    """
+    lengths = []
+    latencies = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = search(source, target)
+        latencies.append(time.perf_counter() - start)
+        lengths.append(None if path is None else len(path))
+    return lengths, latencies
+
+
+def summarize(name, latencies):
+    latencies = sorted(latencies)
+    mean = sum(latencies) / len(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:>16}: mean {mean * 1000:8.2f} ms, "
+          f"p95 {p95 * 1000:8.2f} ms, max {latencies[-1] * 1000:8.2f} ms")
+    return mean
+
+
+def resident_memory():
+    """
+    Returns the resident set size of this process in bytes.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def measure_backend(directory, backend):
+    """
+    Loads the data with a backend in a fresh interpreter and returns
+    the resident memory (in bytes) and load time it reports.
+    """
+    code = (
+        "import sys, time, benchmark, degrees\n"
+        "before = benchmark.resident_memory()\n"
+        "start = time.perf_counter()\n"
+        "degrees.load_data(sys.argv[1], sys.argv[2])\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(benchmark.resident_memory() - before, elapsed)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code, directory, backend],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return int(output[0]), float(output[1])
+
+
+def memory_report(directory):
+    print(f"Resident memory of loaded graph ({directory})")
+    results = {}
+    for backend in ["dict", "csr"]:
+        memory, elapsed = measure_backend(directory, backend)
+        results[backend] = memory
+        print(f"{backend:>16}: {memory / 2 ** 20:8.1f} MiB, "
+              f"loaded in {elapsed:.2f} s")
+    print(f"Reduction: {results['dict'] / max(results['csr'], 1):.1f}x")
+
+
+def latency_report(directory, count, backend):
+    print("Loading data...")
+    degrees.load_data(directory, backend)
+    print("Data loaded.")
+
+    pairs = random_pairs(count)
+    baseline_lengths, baseline = time_queries(unidirectional_path, pairs)
+    lengths, bidirectional = time_queries(degrees.shortest_path, pairs)
+
+    if baseline_lengths != lengths:
+        sys.exit("Path lengths differ between searches.")
+
+    print(f"{count} random pairs, {backend} backend")
+    before = summarize("unidirectional", baseline)
+    after = summarize("bidirectional", bidirectional)
+    print(f"Speedup: {before / after:.1f}x")
+
+
+def landmark_report(directory, count):
+    print("Loading data...")
+    degrees.load_data(directory, "csr", use_landmarks=True)
+    print("Data loaded.")
+    graph, index = degrees.graph, degrees.landmark_index
+
+    pairs = random_pairs(count)
+    lengths, guided = time_queries(degrees.shortest_path, pairs)
+    index_lengths = lengths
+    for source, target in pairs:
+        path = degrees.shortest_path(source, target)
+        if not valid_path(source, target, path):
+            sys.exit(f"Invalid path for {source}, {target}.")
+    degrees.landmark_index = None
+    lengths, bidirectional = time_queries(degrees.shortest_path, pairs)
+    degrees.landmark_index = index
+
+    # Every indexed path must be as short as the plain one, and
+    # the landmark bounds must contain the true distance
+    for (source, target), expected, length in zip(
+        pairs, lengths, index_lengths
+    ):
+        if expected != length:
+            sys.exit(f"Length differs for {source}, {target}: "
+                     f"{length} instead of {expected}.")
+        bounds = index.bounds(graph.person_index[source],
+                              graph.person_index[target])
+        if expected is None:
+            continue
+        lower, upper = bounds
+        if lower > expected or (upper is not None and upper < expected):
+            sys.exit(f"Bounds {bounds} exclude {expected} "
+                     f"for {source}, {target}.")
+
+    print(f"{count} random pairs, {len(index.landmarks)} landmarks")
+    before = summarize("bidirectional", bidirectional)
+    after = summarize("landmark index", guided)
+    print(f"Speedup: {before / after:.1f}x")
+
+
+class ListFrontier():
+    """
+    The former list-based frontier, kept as a baseline: slicing on
+    every removal and a linear scan in contains_state.
+    """
+
+    def __init__(self, lifo):
+        self.frontier = []
+        self.lifo = lifo
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.lifo:
+            node = self.frontier[-1]
+            self.frontier = self.frontier[:-1]
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+        return node
+
+
+def frontier_workload(frontier, size):
+    """
+    Adds size nodes, checking contains_state after each, then removes
+    them all. Returns the mean time per operation in seconds.
+    """
+    start = time.perf_counter()
+    for i in range(size):
+        frontier.add(Node(i, None, None))
+        frontier.contains_state(size - i)
+    while not frontier.empty():
+        frontier.remove()
+    return (time.perf_counter() - start) / (3 * size)
+
+
+def frontier_report():
+    frontiers = [
+        ("list stack", lambda: ListFrontier(lifo=True), 10000),
+        ("list queue", lambda: ListFrontier(lifo=False), 10000),
+        ("StackFrontier", StackFrontier, None),
+        ("QueueFrontier", QueueFrontier, None),
+        ("PriorityFrontier",
+         lambda: PriorityFrontier(lambda node: node.state * 7919 % 1009),
+         None),
+    ]
+    sizes = [1000, 10000, 100000]
+    print(f"{'time per op':>16}" +
+          "".join(f"{size:>12}" for size in sizes))
+    for name, frontier, largest in frontiers:
+        row = f"{name:>16}"
+        for size in sizes:
+            if largest is not None and size > largest:
+                row += f"{'-':>12}"
+            else:
+                mean = frontier_workload(frontier(), size)
+                row += f"{mean * 1e6:>9.2f} µs"
+        print(row)
+
+
+def main():
+    args = sys.argv[1:]
+    mode = "latency"
+    backend = "dict"
+    while args and args[0].startswith("--"):
+        if args[0] == "--memory":
+            mode = "memory"
+        elif args[0] == "--landmarks":
+            mode = "landmarks"
+        elif args[0] == "--frontiers":
+            mode = "frontiers"
+        elif args[0] == "--csr":
+            backend = "csr"
+        else:
+            sys.exit(f"Unknown option {args[0]}")
+        args = args[1:]
+    if len(args) > 2:
+        sys.exit("Usage: python benchmark.py "
+                 "[--memory | --landmarks | --frontiers] [--csr] "
+                 "[directory] [pairs]")
+    directory = args[0] if args else "large"
+    count = int(args[1]) if len(args) > 1 else 100
+
+    if mode == "frontiers":
+        frontier_report()
+    elif mode == "memory":
+        memory_report(directory)
+    elif mode == "landmarks":
+        landmark_report(directory, count)
+    else:
+        latency_report(directory, count, backend)
+
+
+if __name__ == "__main__":
+    main()
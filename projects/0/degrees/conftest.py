@@ -0,0 +1,64 @@
+import csv
+import random
+
+import pytest
+
+import degrees
+
+
+def write_dataset(directory, people, movies, stars):
+    """
+    Writes people (id, name, birth), movies (id, title, year) and stars
+    (person_id, movie_id) rows as a dataset in directory.
+    """
+    files = [
+        ("people.csv", ["id", "name", "birth"], people),
+        ("movies.csv", ["id", "title", "year"], movies),
+        ("stars.csv", ["person_id", "movie_id"], stars),
+    ]
+    for filename, header, rows in files:
+        with open(directory / filename, "w", encoding="utf-8",
+                  newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return str(directory)
+
+
+def random_dataset(directory, seed=0, people=300, movies=200):
+    """
+    Writes a random dataset where a few popular people star in many
+    movies, as in the real one. The last tenth of the people only star
+    with each other, and a few star in nothing, so that some pairs are
+    not connected.
+    """
+    rng = random.Random(seed)
+    main = people - people // 10
+    rows = [(str(i), f"Person {i % (people - 5)}", str(1950 + i % 50))
+            for i in range(people)]
+    titles = [(str(1000 + j), f"Movie {j}", str(1980 + j % 40))
+              for j in range(movies)]
+    stars = []
+    for j in range(movies):
+        if j < movies - movies // 10:
+            cast = {int(main * rng.random() ** 2)
+                    for _ in range(rng.randint(2, 4))}
+        else:
+            cast = {rng.randrange(main, people - 3)
+                    for _ in range(rng.randint(2, 3))}
+        stars.extend((str(i), str(1000 + j)) for i in sorted(cast))
+    return write_dataset(directory, rows, titles, stars)
+
+
+@pytest.fixture
+def small(tmp_path):
+    """A random dataset of 300 people in 200 movies."""
+    return random_dataset(tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def unload():
+    """Forgets the data a test loaded into degrees."""
+    yield
+    degrees.graph = degrees.landmark_index = degrees.name_lookup = None
+    degrees.names, degrees.people, degrees.movies = {}, {}, {}
@@ -1,7 +1,10 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import delta
+import landmarks
+import lookup
+from util import bidirectional_search, dag_paths, shortest_path_dag
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +15,66 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact CSR graph, set when data is loaded with the "csr" backend
+graph = None
 
-def load_data(directory):
+# Landmark distance index, set when data is loaded with landmarks
+landmark_index = None
+
+# Prefix and fuzzy name index, set when data is loaded with it
+name_lookup = None
+
+# Directory of the loaded dataset, whose journal records applied deltas
+data_directory = None
+
+# Incremented whenever data is loaded or changed by a delta, so that
+# caches of search results can tell when they are out of date
+generation = 0
+
+
+def load_data(directory, backend="dict", use_landmarks=False,
+              use_name_index=False):
     """
     Load data from CSV files into memory.
+
+    With the "csr" backend, the graph is stored as integer-indexed CSR
+    arrays, and names, people and movies become read-only views over it.
+    The graph is memory-mapped from a binary snapshot next to the CSV
+    files, which is (re)written whenever it is missing or out of date.
+
+    With use_landmarks (which requires the "csr" backend), a landmark
+    distance index is loaded or built as well, and shortest_path runs
+    an A* search guided by it.
+
+    With use_name_index, a persisted name index supporting prefix and
+    typo-tolerant lookups is loaded or built as well.
+
+    Deltas recorded in the dataset's journal by apply_delta are applied
+    on top of the CSV files with every backend.
     """
+    global graph, names, people, movies, landmark_index, name_lookup
+    global data_directory, generation
+    generation += 1
+    landmark_index = None
+    name_lookup = None
+    data_directory = directory
+    if backend == "csr":
+        graph, _ = delta.load_graph(directory)
+        names, people, movies = graph.names, graph.people, graph.movies
+        if use_landmarks:
+            landmark_index = landmarks.load_or_build(graph, directory)
+        if use_name_index:
+            name_lookup = lookup.load_or_build(
+                directory, lambda: lookup.entries_from_graph(graph), people
+            )
+        return
+    elif use_landmarks:
+        raise ValueError("landmarks require the csr backend")
+    elif backend != "dict":
+        raise ValueError(f"unknown backend {backend}")
+    graph = None
+    names, people, movies = {}, {}, {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,15 +109,107 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    rows, _ = delta.read_journal(directory)
+    apply_rows(rows)
+
+    if use_name_index:
+        name_lookup = lookup.load_or_build(
+            directory, lambda: lookup.entries_from_people(people), people
+        )
+
+
+def apply_rows(rows):
+    """
+    Adds the new people, movies and stars of delta rows to the loaded data.
+
+    Returns the person_ids of the people added, and the (person, movie)
+    index pairs of the stars added to the CSR graph, or the (person_id,
+    movie_id) pairs added to the dicts.
+    """
+    if graph is not None:
+        return delta.apply_to_graph(graph, rows)
+
+    added = []
+    stars = []
+    for kind, *fields in rows:
+        if kind == "person":
+            person_id, name, birth = fields
+            if person_id in people:
+                continue
+            people[person_id] = {"name": name, "birth": birth,
+                                 "movies": set()}
+            names.setdefault(name.lower(), set()).add(person_id)
+            added.append(person_id)
+        elif kind == "movie":
+            movie_id, title, year = fields
+            if movie_id in movies:
+                continue
+            movies[movie_id] = {"title": title, "year": year, "stars": set()}
+        elif kind == "star":
+            person_id, movie_id = fields
+            if (person_id not in people or movie_id not in movies
+                    or movie_id in people[person_id]["movies"]):
+                continue
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+            stars.append((person_id, movie_id))
+    return added, stars
+
+
+def apply_delta(delta_directory):
+    """
+    Applies delta people.csv, movies.csv and stars.csv files in
+    delta_directory to the loaded data without reloading it.
+
+    The deltas are appended to the loaded dataset's journal, so that later
+    loads include them, and the landmark and name indices in use are
+    updated incrementally rather than rebuilt.
+    """
+    global generation
+    rows = delta.read_delta(delta_directory)
+    added, stars = apply_rows(rows)
+    generation += 1
+    journal = delta.append_journal(data_directory, rows)
+
+    if landmark_index is not None:
+        landmark_index.update(graph, stars)
+        landmark_index.journal = journal
+        try:
+            landmark_index.save(data_directory)
+        except OSError:
+            pass
+    if name_lookup is not None:
+
+        # Index the people added, and update those given new movies
+        if graph is not None:
+            starred = [graph.person_ids[person] for person, _ in stars]
+        else:
+            starred = [person_id for person_id, _ in stars]
+        name_lookup.add(
+            (person_id, people[person_id]["name"],
+             len(people[person_id]["movies"]))
+            for person_id in dict.fromkeys(added + starred)
+        )
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = sys.argv[1:]
+    backend = "dict"
+    use_landmarks = False
+    if args and args[0] == "--landmarks":
+        backend = "csr"
+        use_landmarks = True
+        args = args[1:]
+    elif args and args[0] == "--csr":
+        backend = "csr"
+        args = args[1:]
+    if len(args) > 1:
+        sys.exit("Usage: python degrees.py [--csr | --landmarks] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, backend, use_landmarks)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -91,41 +241,40 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    if landmark_index is not None:
+        path = landmark_index.shortest_path(
+            graph, graph.person_index[source], graph.person_index[target]
+        )
+        return graph.path_ids(path)
+    if graph is not None:
+        path = bidirectional_search(
+            graph.person_index[source], graph.person_index[target],
+            graph.neighbors
+        )
+        return graph.path_ids(path)
+    return bidirectional_search(source, target, neighbors_for_person)
 
-    found = False
-    path = []
-    frontiers = [([], None, source)]
-    checked = [source]
 
-    if source == target:
-        return path
-    
-    def check_neighbors(person):
-        neighbors = neighbors_for_person(person[2])
-        for neighbor in neighbors:
-            if neighbor[1] in checked:
-                continue
-            elif target == neighbor[1]:
-                nonlocal path
-                path = person[0][:]
-                path.append(neighbor)
-                return True
-            else:
-                checked.append(neighbor[1])
-                current_path = person[0][:]
-                current_path.append(neighbor)
-                neighbor_to_frontier = (current_path, neighbor[0], neighbor[1])
-                frontiers.append(neighbor_to_frontier)
-        
-        return False
+def shortest_paths(source, target):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
 
-    while len(frontiers) != 0 and not found:
-        found = check_neighbors(frontiers[0])
-        if found:
-            return path
-        frontiers.pop(0)
+    Paths are generated one at a time from the DAG of shortest-path
+    predecessors, so callers can stop early, for example with
+    itertools.islice(shortest_paths(source, target), n).
+    """
+    if graph is not None:
+        source, target = graph.person_index[source], graph.person_index[target]
+        parents = shortest_path_dag(source, target, graph.neighbors)
+        if parents is not None:
+            for path in dag_paths(parents, source, target):
+                yield graph.path_ids(path)
+        return
 
-    return None
+    parents = shortest_path_dag(source, target, neighbors_for_person)
+    if parents is not None:
+        yield from dag_paths(parents, source, target)
 
 
 def person_id_for_name(name):
@@ -134,9 +283,16 @@ def person_id_for_name(name):
     resolving ambiguities as needed.
     """
     person_ids = list(names.get(name.lower(), set()))
+
+    # Offer the closest names when there is no exact match
+    suggested = False
+    if len(person_ids) == 0 and name_lookup is not None:
+        person_ids = name_lookup.search(name, 5)
+        suggested = True
+
     if len(person_ids) == 0:
         return None
-    elif len(person_ids) > 1:
+    elif len(person_ids) > 1 or suggested:
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -154,11 +310,24 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_query(query, limit=10):
+    """
+    Returns up to limit person_ids matching a name query, best first,
+    without prompting. Uses the name index for prefix and typo-tolerant
+    matches when it is loaded, and exact names otherwise.
+    """
+    if name_lookup is not None:
+        return name_lookup.search(query, limit)
+    return sorted(names.get(query.lower(), set()))[:limit]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
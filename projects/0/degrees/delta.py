@@ -0,0 +1,120 @@
+import csv
+import io
+import os
+
+import snapshot
+
+FILENAME = "degrees.journal"
+
+
+def journal_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def read_delta(directory):
+    """
+    Reads delta people.csv, movies.csv and stars.csv files (any of which
+    may be missing) in the format of the dataset.
+
+    Returns a list of ("person", id, name, birth), ("movie", id, title,
+    year) and ("star", person_id, movie_id) rows, people and movies first.
+    """
+    rows = []
+    files = [
+        ("people.csv", "person", ["id", "name", "birth"]),
+        ("movies.csv", "movie", ["id", "title", "year"]),
+        ("stars.csv", "star", ["person_id", "movie_id"]),
+    ]
+    for filename, kind, columns in files:
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                rows.append((kind, *(row[column] for column in columns)))
+    return rows
+
+
+def stats_line(directory):
+    """
+    Returns the first line of a journal, which ties it to the current
+    mtime and size of the dataset's CSV files.
+    """
+    stats = snapshot.source_stats(directory)
+    return "#" + ",".join(f"{mtime}:{size}" for mtime, size in stats) + "\n"
+
+
+def read_journal(directory, start=0):
+    """
+    Returns (rows, end) for the journal rows from byte offset start onward,
+    where end is the journal's length in bytes.
+
+    A journal written against CSV files that have since changed is
+    ignored, as the rebuilt dataset is assumed to include its deltas.
+    """
+    try:
+        with open(journal_path(directory), "rb") as f:
+            data = f.read()
+    except OSError:
+        return [], 0
+    header = stats_line(directory).encode("utf-8")
+    if not data.startswith(header):
+        return [], 0
+    start = max(start, len(header))
+    text = data[start:].decode("utf-8")
+    rows = [tuple(row) for row in csv.reader(io.StringIO(text)) if row]
+    return rows, len(data)
+
+
+def append_journal(directory, rows):
+    """
+    Appends delta rows to the journal of directory, starting a new journal
+    if there is none or it is out of date. Returns the journal's new length.
+    """
+    path = journal_path(directory)
+    header = stats_line(directory)
+    try:
+        with open(path, encoding="utf-8") as f:
+            current = f.readline() == header
+    except OSError:
+        current = False
+
+    with open(path, "a" if current else "w", encoding="utf-8",
+              newline="") as f:
+        if not current:
+            f.write(header)
+        csv.writer(f).writerows(rows)
+    return os.path.getsize(path)
+
+
+def apply_to_graph(graph, rows):
+    """
+    Adds the people, movies and stars of delta rows to a CSRGraph.
+
+    Returns the person_ids of the people actually added, and the
+    (person, movie) index pairs of the stars actually added.
+    """
+    people = []
+    stars = []
+    for kind, *fields in rows:
+        if kind == "person":
+            if graph.add_person(*fields):
+                people.append(fields[0])
+        elif kind == "movie":
+            graph.add_movie(*fields)
+        elif kind == "star":
+            star = graph.add_star(*fields)
+            if star is not None:
+                stars.append(star)
+    return people, stars
+
+
+def load_graph(directory):
+    """
+    Returns the CSRGraph of directory with its journal of deltas applied,
+    and the length of that journal.
+    """
+    graph = snapshot.load_or_build(directory)
+    rows, journal = read_journal(directory)
+    apply_to_graph(graph, rows)
+    return graph, journal
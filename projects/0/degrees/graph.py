@@ -0,0 +1,364 @@
+import csv
+from array import array
+from collections import ChainMap
+from collections.abc import Mapping, Sequence
+
+
+class CSRGraph():
+    """
+    Compact person <-> movie graph.
+
+    Person and movie IDs are interned to consecutive integers, and the
+    bipartite adjacency is stored as CSR arrays: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the stars of
+    movie m are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None, name_index=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Map IDs and lowercase names to indices, unless prebuilt
+        # indices (such as those of a snapshot) are given
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {
+                movie_id: i for i, movie_id in enumerate(movie_ids)
+            }
+        if name_index is None:
+            name_index = {}
+            for i, name in enumerate(person_names):
+                name_index.setdefault(name.lower(), []).append(i)
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.name_index = name_index
+
+        # People, movies and stars added by deltas after the CSR arrays
+        # were built: movies added to each person, stars added to each
+        # movie, and people added under each lowercase name
+        self.base_people = len(person_offsets) - 1
+        self.base_movies = len(movie_offsets) - 1
+        self.added_movies = {}
+        self.added_stars = {}
+        self.added_names = {}
+
+        # Dict-compatible read-only views for code written against degrees.py
+        self.names = NamesView(self)
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a graph from the people, movies and stars CSV files.
+        """
+        person_ids, person_names, person_births = [], [], []
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] in person_index:
+                    continue
+                person_index[row["id"]] = len(person_ids)
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] in movie_index:
+                    continue
+                movie_index[row["id"]] = len(movie_ids)
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        star_people, star_movies = array("i"), array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person = person_index.get(row["person_id"])
+                movie = movie_index.get(row["movie_id"])
+                if person is None or movie is None:
+                    continue
+                star_people.append(person)
+                star_movies.append(movie)
+
+        person_offsets, person_movies = build_csr(
+            len(person_ids), star_people, star_movies
+        )
+        movie_offsets, movie_people = build_csr(
+            len(movie_ids), star_movies, star_people
+        )
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_people)
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices of a person index.
+        """
+        movies = ()
+        if person < self.base_people:
+            offsets = self.person_offsets
+            movies = self.person_movies[offsets[person]:offsets[person + 1]]
+        added = self.added_movies.get(person)
+        return list(movies) + added if added else movies
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices of a movie index.
+        """
+        stars = ()
+        if movie < self.base_movies:
+            offsets = self.movie_offsets
+            stars = self.movie_people[offsets[movie]:offsets[movie + 1]]
+        added = self.added_stars.get(movie)
+        return list(stars) + added if added else stars
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with a given person index.
+        """
+        if self.added_movies or person >= self.base_people:
+            for movie in self.movies_of(person):
+                for star in self.stars_of(movie):
+                    yield movie, star
+            return
+
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        person_ids, movie_ids = self.person_ids, self.movie_ids
+        return {
+            (movie_ids[movie], person_ids[person])
+            for movie, person in self.neighbors(self.person_index[person_id])
+        }
+
+    def people_named(self, name):
+        """
+        Returns the person indices of a lowercase name.
+        """
+        people = list(self.name_index.get(name, []))
+        people.extend(self.added_names.get(name, []))
+        return people
+
+    def add_person(self, person_id, name, birth):
+        """
+        Adds a new person, returning False if the ID is already known.
+        """
+        if person_id in self.person_index:
+            return False
+        self.extend_columns("person_ids", "person_names", "person_births")
+        if not isinstance(self.person_index, dict):
+            self.person_index = ChainMap({}, self.person_index)
+        person = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_index[person_id] = person
+        self.added_names.setdefault(name.lower(), []).append(person)
+        return True
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Adds a new movie, returning False if the ID is already known.
+        """
+        if movie_id in self.movie_index:
+            return False
+        self.extend_columns("movie_ids", "movie_titles", "movie_years")
+        if not isinstance(self.movie_index, dict):
+            self.movie_index = ChainMap({}, self.movie_index)
+        self.movie_index[movie_id] = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        return True
+
+    def add_star(self, person_id, movie_id):
+        """
+        Records that a person starred in a movie, returning the (person,
+        movie) indices, or None if either is unknown or already linked.
+        """
+        person = self.person_index.get(person_id)
+        movie = self.movie_index.get(movie_id)
+        if person is None or movie is None or movie in self.movies_of(person):
+            return None
+        self.added_movies.setdefault(person, []).append(movie)
+        self.added_stars.setdefault(movie, []).append(person)
+        return person, movie
+
+    def extend_columns(self, *columns):
+        """
+        Makes read-only columns (such as those of a snapshot) appendable.
+        """
+        for column in columns:
+            values = getattr(self, column)
+            if not isinstance(values, (list, Extended)):
+                setattr(self, column, Extended(values))
+
+    def path_ids(self, path):
+        """
+        Converts a path of (movie, person) indices to
+        (movie_id, person_id) pairs.
+        """
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+def build_csr(rows, sources, targets):
+    """
+    Returns (offsets, indices) arrays grouping targets by source row,
+    with duplicates removed and each row sorted.
+    """
+    counts = array("i", bytes(4 * (rows + 1)))
+    for source in sources:
+        counts[source + 1] += 1
+    for i in range(rows):
+        counts[i + 1] += counts[i]
+
+    indices = array("i", bytes(4 * len(sources)))
+    fill = counts[:-1]
+    for source, target in zip(sources, targets):
+        indices[fill[source]] = target
+        fill[source] += 1
+
+    # Drop duplicate rows in stars.csv, as the set-based loader does
+    offsets = array("i", [0])
+    unique = array("i")
+    for i in range(rows):
+        unique.extend(sorted(set(indices[counts[i]:counts[i + 1]])))
+        offsets.append(len(unique))
+    return offsets, unique
+
+
+class Extended(Sequence):
+    """
+    Read-only sequence with new items appended after it.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.added = []
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < len(self.base):
+            return self.base[i]
+        return self.added[i - len(self.base)]
+
+    def __len__(self):
+        return len(self.base) + len(self.added)
+
+    def append(self, value):
+        self.added.append(value)
+
+
+class NamesView(Mapping):
+    """
+    Maps lowercase names to a set of corresponding person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        people = self.graph.people_named(name)
+        if not people:
+            raise KeyError(name)
+        return {self.graph.person_ids[i] for i in people}
+
+    def __iter__(self):
+        yield from self.graph.name_index
+        for name in self.graph.added_names:
+            if name not in self.graph.name_index:
+                yield name
+
+    def __len__(self):
+        return len(self.graph.name_index) + sum(
+            1 for name in self.graph.added_names
+            if name not in self.graph.name_index
+        )
+
+
+class PeopleView(Mapping):
+    """
+    Maps person_ids to a dictionary of: name, birth, movies.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(person)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Maps movie_ids to a dictionary of: title, year, stars.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[p] for p in graph.stars_of(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
@@ -0,0 +1,385 @@
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+
+import delta
+import snapshot
+from util import Node, PriorityFrontier, bidirectional_search
+
+VERSION = 2
+MAGIC = b"LANDMARK"
+FILENAME = "landmarks.index"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+# Landmarks in a default index. Each costs a BFS to build and a byte per
+# person, about 100 MB for 100 landmarks over a million people, and more
+# landmarks tighten the bounds less and less
+LANDMARKS = 100
+
+# Landmarks guiding each search, those giving the best lower bounds for
+# the pair. Each costs a lookup per person reached, and past about 8 the
+# tighter bounds no longer save enough of the search to pay for it
+ACTIVE = 8
+
+HEADER = struct.Struct("<8sIqqq")
+
+
+def index_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def select_landmarks(graph, count):
+    """
+    Returns the person indices of the count people with the most co-stars.
+    """
+    def degree(person):
+        return sum(len(graph.stars_of(movie))
+                   for movie in graph.movies_of(person))
+    return heapq.nlargest(count, range(len(graph.person_ids)), key=degree)
+
+
+def landmark_distances(graph, landmark):
+    """
+    Returns a bytearray of the distance from a landmark to every person.
+
+    The BFS walks the bipartite person <-> movie graph so that each movie
+    is expanded once, rather than once per co-star.
+    """
+    distances = bytearray([UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[landmark] = 0
+    frontier = deque([landmark])
+    while frontier:
+        person = frontier.popleft()
+        distance = min(distances[person] + 1, UNREACHABLE - 1)
+        for movie in graph.movies_of(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_of(movie):
+                if distances[star] == UNREACHABLE:
+                    distances[star] = distance
+                    frontier.append(star)
+    return distances
+
+
+class LandmarkIndex():
+    """
+    Precomputed BFS distances from a set of landmark people, giving bounds
+    on degrees of separation and lower bounds that guide an A* search
+    (the ALT algorithm: A*, landmarks and the triangle inequality).
+    """
+
+    def __init__(self, landmarks, distances, people, journal=0):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.people = people
+
+        # Length of the dataset's journal of deltas already included
+        self.journal = journal
+
+    @classmethod
+    def build(cls, graph, count=LANDMARKS, journal=0):
+        landmarks = select_landmarks(graph, count)
+        distances = bytearray()
+        for landmark in landmarks:
+            distances += landmark_distances(graph, landmark)
+        return cls(array("i", landmarks), distances, len(graph.person_ids),
+                   journal)
+
+    def save(self, directory):
+        stats = snapshot.source_stats(directory)
+        path = index_path(directory)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.people,
+                                len(self.landmarks), self.journal))
+            for stat in stats:
+                f.write(snapshot.STAT.pack(*stat))
+            f.write(array("i", self.landmarks).tobytes())
+            f.write(self.distances)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-maps the index in directory, or returns None if it is
+        missing or out of date with the CSV files.
+        """
+        try:
+            with open(index_path(directory), "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stats = snapshot.source_stats(directory)
+        except (OSError, ValueError):
+            return None
+        if len(buffer) < HEADER.size:
+            return None
+        magic, version, people, count, journal = HEADER.unpack_from(buffer, 0)
+        offset = HEADER.size
+        for stat in stats:
+            if snapshot.STAT.unpack_from(buffer, offset) != stat:
+                return None
+            offset += snapshot.STAT.size
+        if (magic != MAGIC or version != VERSION
+                or len(buffer) != offset + 4 * count + people * count):
+            return None
+        view = memoryview(buffer)
+        landmarks = view[offset:offset + 4 * count].cast("i")
+        distances = view[offset + 4 * count:]
+        return cls(landmarks, distances, people, journal)
+
+    def update(self, graph, stars):
+        """
+        Updates the distances after deltas added people and the given
+        (person, movie) index pairs of new stars to graph.
+
+        Adding stars can only shorten distances, so each landmark only
+        relaxes the co-stars of the changed movies and the people whose
+        distance drops as a result, without a full BFS.
+        """
+        people = len(graph.person_ids)
+        if people != self.people or not isinstance(self.distances,
+                                                   bytearray):
+            grown = bytearray()
+            for i in range(len(self.landmarks)):
+                grown += self.distances[i * self.people:(i + 1) * self.people]
+                grown += bytes([UNREACHABLE]) * (people - self.people)
+            self.distances, self.people = grown, people
+
+        distances = self.distances
+        movies = {movie for _, movie in stars}
+        for i in range(len(self.landmarks)):
+            row = i * people
+            frontier = deque()
+            for movie in movies:
+                stars_of = graph.stars_of(movie)
+                nearest = min(distances[row + star] for star in stars_of)
+                if nearest >= UNREACHABLE - 1:
+                    continue
+                for star in stars_of:
+                    if distances[row + star] > nearest + 1:
+                        distances[row + star] = nearest + 1
+                        frontier.append(star)
+            while frontier:
+                person = frontier.popleft()
+                distance = min(distances[row + person] + 1, UNREACHABLE - 1)
+                for movie in graph.movies_of(person):
+                    for star in graph.stars_of(movie):
+                        if distances[row + star] > distance:
+                            distances[row + star] = distance
+                            frontier.append(star)
+
+    def distance(self, i, person):
+        """
+        Returns the distance from the i-th landmark to a person index.
+        """
+        return self.distances[i * self.people + person]
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between two person
+        indices, or None if some landmark proves they are not connected.
+        Upper is None when no landmark reaches both.
+        """
+        bounds = self.scan(source, target)
+        return None if bounds is None else bounds[:2]
+
+    def scan(self, source, target):
+        """
+        Returns (lower, upper, landmark) where landmark is the index of the
+        landmark giving the upper bound, or None if not connected.
+        """
+        lower, upper, best = 0, None, None
+        for i in range(len(self.landmarks)):
+            s, t = self.distance(i, source), self.distance(i, target)
+            if s == UNREACHABLE or t == UNREACHABLE:
+                if s != t:
+                    return None
+                continue
+            if s > t:
+                lower = max(lower, s - t)
+            else:
+                lower = max(lower, t - s)
+            if upper is None or s + t < upper:
+                upper, best = s + t, i
+        return lower, upper, best
+
+    def descend(self, graph, i, person):
+        """
+        Returns a shortest list of (movie, person) index pairs leading from
+        a person to the i-th landmark, following decreasing distances.
+        """
+        path = []
+        distance = self.distance(i, person)
+        while distance > 0:
+            distance -= 1
+            person, movie = next(
+                (star, movie) for movie, star in graph.neighbors(person)
+                if self.distance(i, star) == distance
+            )
+            path.append((movie, person))
+        return path
+
+    def landmark_path(self, graph, i, source, target):
+        """
+        Returns the list of (movie, person) index pairs leading from source
+        to target through the i-th landmark.
+        """
+        path = self.descend(graph, i, source)
+        back = self.descend(graph, i, target)
+        people = [target] + [person for _, person in back]
+        for j in range(len(back) - 1, -1, -1):
+            path.append((back[j][0], people[j]))
+        return path
+
+    def active(self, source, target):
+        """
+        Returns the indices of the ACTIVE landmarks reaching both people
+        that give the best lower bounds on their distance.
+        """
+        gaps = []
+        for i in range(len(self.landmarks)):
+            s, t = self.distance(i, source), self.distance(i, target)
+            if s != UNREACHABLE and t != UNREACHABLE:
+                gaps.append((abs(s - t), i))
+        return [i for _, i in heapq.nlargest(ACTIVE, gaps)]
+
+    def shortest_path(self, graph, source, target):
+        """
+        Returns the shortest list of (movie, person) index pairs from
+        source to target, or None if they are not connected.
+
+        The landmark bounds answer disconnected pairs, and pairs whose
+        bounds meet, without searching. Otherwise an A* search guided by
+        the lower bound from each person to target, max |d(L, person) -
+        d(L, target)| over the active landmarks L, only looks for paths
+        shorter than the upper bound, falling back to the path through
+        the landmark that gives it.
+        """
+        if source == target:
+            return []
+        bounds = self.scan(source, target)
+        if bounds is None:
+            return None
+        lower, upper, best = bounds
+        if upper is None:
+            return bidirectional_search(source, target, graph.neighbors)
+        if lower == upper:
+            return self.landmark_path(graph, best, source, target)
+
+        # Each active landmark's row of distances, and its distance to
+        # target, giving max |d(L, person) - d(L, target)|
+        distances = memoryview(self.distances)
+        rows = [(distances[i * self.people:(i + 1) * self.people],
+                 self.distance(i, target))
+                for i in self.active(source, target)]
+
+        # Priority of the node queued for each person: the estimated
+        # length of the whole path, then the deepest first among equals,
+        # as it is the closest to target
+        costs = {source: 0}
+        priorities = {source: (lower, 0)}
+        movie_costs = {}
+        expanded = set()
+        frontier = PriorityFrontier(lambda node: priorities[node.state])
+        frontier.add(Node(source, None, None))
+        while not frontier.empty():
+            node = frontier.remove()
+            if node.state in expanded:
+                continue
+            if node.state == target:
+                path = []
+                while node.parent is not None:
+                    path.append((node.action, node.state))
+                    node = node.parent
+                path.reverse()
+                return path
+            expanded.add(node.state)
+            cost = costs[node.state] + 1
+            for movie in graph.movies_of(node.state):
+
+                # Co-stars already reached as cheaply through this movie
+                if movie_costs.get(movie, upper) <= cost:
+                    continue
+                movie_costs[movie] = cost
+                for person in graph.stars_of(movie):
+                    if cost >= costs.get(person, upper):
+                        continue
+                    estimate = 0
+                    for row, t in rows:
+                        gap = row[person] - t
+                        if gap < 0:
+                            gap = -gap
+                        if gap > estimate:
+                            estimate = gap
+                    if cost + estimate >= upper:
+                        continue
+                    costs[person] = cost
+                    priorities[person] = (cost + estimate, -cost)
+                    frontier.add(Node(person, node, movie))
+        return self.landmark_path(graph, best, source, target)
+
+
+def stars_for_rows(graph, rows):
+    """
+    Returns the (person, movie) index pairs of the star rows of a delta.
+    """
+    stars = []
+    for kind, *fields in rows:
+        if kind == "star":
+            person = graph.person_index.get(fields[0])
+            movie = graph.movie_index.get(fields[1])
+            if person is not None and movie is not None:
+                stars.append((person, movie))
+    return stars
+
+
+def load_or_build(graph, directory, count=LANDMARKS):
+    """
+    Returns the landmark index for directory, building and saving it
+    if it is missing or out of date.
+    """
+    index = LandmarkIndex.load(directory)
+    rows, journal = delta.read_journal(directory)
+    if index is not None and index.journal < journal:
+
+        # Catch up with deltas journaled since the index was saved
+        rows, journal = delta.read_journal(directory, index.journal)
+        index.update(graph, stars_for_rows(graph, rows))
+        index.journal = journal
+        try:
+            index.save(directory)
+        except OSError:
+            pass
+    if index is not None and index.people == len(graph.person_ids):
+        return index
+    index = LandmarkIndex.build(graph, count, journal)
+    try:
+        index.save(directory)
+    except OSError:
+        pass
+    return index
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [count]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else LANDMARKS
+
+    print("Loading data...")
+    graph, journal = delta.load_graph(directory)
+    print(f"Building index from {count} landmarks...")
+    index = LandmarkIndex.build(graph, count, journal)
+    index.save(directory)
+    print(f"Index written to {index_path(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
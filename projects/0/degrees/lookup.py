@@ -0,0 +1,387 @@
+import heapq
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+import delta
+import snapshot
+
+VERSION = 2
+MAGIC = b"NAMEINDX"
+FILENAME = "names.index"
+
+# Longest posting list scanned for one trigram of a fuzzy query
+MAX_POSTINGS = 5000
+
+# Lowest trigram similarity for a fuzzy match
+MIN_SIMILARITY = 0.3
+
+SECTIONS = [
+    "keys.offsets", "keys.blob", "person_ids.offsets", "person_ids.blob",
+    "popularity", "tree", "grams.offsets", "grams.blob",
+    "gram_offsets", "gram_entries", "journal"
+]
+
+
+def index_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def trigrams(name):
+    """
+    Returns the set of trigrams of a lowercase name, padded so that
+    the start and end of the name count as well.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def entries_from_graph(graph):
+    """
+    Yields (person_id, name, popularity) for every person of a CSRGraph,
+    where popularity is the number of movies they starred in.
+    """
+    for i in range(len(graph.person_ids)):
+        yield (graph.person_ids[i], graph.person_names[i],
+               len(graph.movies_of(i)))
+
+
+def entries_from_people(people):
+    """
+    Yields (person_id, name, popularity) for every person of a people dict.
+    """
+    for person_id, person in people.items():
+        yield person_id, person["name"], len(person["movies"])
+
+
+class NameIndex():
+    """
+    Name lookup by exact name, prefix and trigram similarity, with results
+    ranked by popularity.
+
+    Entries are sorted by lowercase name, so that exact and prefix matches
+    are a contiguous range found by binary search. A max segment tree over
+    popularity yields the most popular entries of a range without scanning
+    it, and trigram posting lists give fuzzy candidates.
+
+    People added by deltas go in a small overlay kept the same way: a
+    sorted list of (key, person_id) searched by binary search, and a
+    dict of trigrams to the person_ids with them.
+    """
+
+    def __init__(self, keys, person_ids, popularity, tree,
+                 grams, gram_offsets, gram_entries, journal=0):
+        self.keys = keys
+        self.person_ids = person_ids
+        self.popularity = popularity
+        self.tree = tree
+        self.grams = grams
+        self.gram_offsets = gram_offsets
+        self.gram_entries = gram_entries
+        self.size = len(tree) // 2
+
+        # Length of the dataset's journal of deltas already included, and
+        # (key, person_id, popularity) entries by person_id of people
+        # added or given new movies since, which replace sorted entries
+        self.journal = journal
+        self.added = {}
+        self.added_keys = []
+        self.added_grams = {}
+
+    @classmethod
+    def build(cls, entries, journal=0):
+        entries = sorted(
+            (name.lower(), person_id, popularity)
+            for person_id, name, popularity in entries
+        )
+        keys = [key for key, _, _ in entries]
+        person_ids = [person_id for _, person_id, _ in entries]
+        popularity = array("i", [count for _, _, count in entries])
+
+        # Leaves hold entry indices, and each parent the more popular child
+        size = 1
+        while size < max(len(entries), 1):
+            size *= 2
+        tree = array("i", [-1]) * (2 * size)
+        for i in range(len(entries)):
+            tree[size + i] = i
+        for node in range(size - 1, 0, -1):
+            left, right = tree[2 * node], tree[2 * node + 1]
+            if right == -1 or (left != -1
+                               and popularity[left] >= popularity[right]):
+                tree[node] = left
+            else:
+                tree[node] = right
+
+        postings = {}
+        for i, key in enumerate(keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, []).append(i)
+        grams = sorted(postings)
+        gram_offsets = array("i", [0])
+        gram_entries = array("i")
+        for gram in grams:
+
+            # Most popular first, so truncated scans keep the best entries
+            gram_entries.extend(
+                sorted(postings[gram], key=lambda i: -popularity[i])
+            )
+            gram_offsets.append(len(gram_entries))
+
+        return cls(keys, person_ids, popularity, tree,
+                   grams, gram_offsets, gram_entries, journal)
+
+    def save(self, directory):
+        sections = []
+        sections.extend(snapshot.encode_strings(self.keys))
+        sections.extend(snapshot.encode_strings(self.person_ids))
+        sections.append(array("i", self.popularity).tobytes())
+        sections.append(array("i", self.tree).tobytes())
+        sections.extend(snapshot.encode_strings(self.grams))
+        sections.append(array("i", self.gram_offsets).tobytes())
+        sections.append(array("i", self.gram_entries).tobytes())
+        sections.append(array("q", [self.journal]).tobytes())
+
+        header = snapshot.HEADER.pack(MAGIC, VERSION)
+        header += b"".join(snapshot.STAT.pack(*stat)
+                           for stat in snapshot.source_stats(directory))
+        snapshot.write_sections(index_path(directory), header, sections)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-maps the index in directory, or returns None if it is
+        missing or out of date with the CSV files.
+        """
+        views = snapshot.open_sections(index_path(directory), MAGIC, VERSION,
+                                       directory, len(SECTIONS))
+        if views is None:
+            return None
+        sections = dict(zip(SECTIONS, views))
+
+        def strings(name):
+            offsets = sections[f"{name}.offsets"].cast("q")
+            return snapshot.StringTable(offsets, sections[f"{name}.blob"])
+
+        return cls(strings("keys"), strings("person_ids"),
+                   sections["popularity"].cast("i"),
+                   sections["tree"].cast("i"), strings("grams"),
+                   sections["gram_offsets"].cast("i"),
+                   sections["gram_entries"].cast("i"),
+                   sections["journal"].cast("q")[0])
+
+    def add(self, entries):
+        """
+        Adds or updates (person_id, name, popularity) entries of people
+        added or given new movies by deltas, which are searched alongside
+        the sorted entries and take the place of their own.
+        """
+        for person_id, name, popularity in entries:
+            key = name.lower()
+            if person_id in self.added:
+                old = self.added[person_id][0]
+                del self.added_keys[bisect_left(self.added_keys,
+                                                (old, person_id))]
+                for gram in trigrams(old):
+                    self.added_grams[gram].discard(person_id)
+            self.added[person_id] = (key, person_id, popularity)
+            insort(self.added_keys, (key, person_id))
+            for gram in trigrams(key):
+                self.added_grams.setdefault(gram, set()).add(person_id)
+
+    def added_range(self, low, high):
+        """
+        Returns the added entries whose key is in [low, high).
+        """
+        start = bisect_left(self.added_keys, (low,))
+        end = bisect_left(self.added_keys, (high,), start)
+        return [self.added[person_id]
+                for _, person_id in self.added_keys[start:end]]
+
+    def ranked(self, indices, added, limit):
+        """
+        Returns up to limit person_ids of entry indices and matching added
+        entries, most popular first.
+        """
+        ranked = [(-self.popularity[i], self.person_ids[i]) for i in indices]
+        ranked.extend((-popularity, person_id)
+                      for _, person_id, popularity in added)
+        ranked.sort()
+        return [person_id for _, person_id in ranked[:limit]]
+
+    def range_max(self, low, high):
+        """
+        Returns the most popular entry index in [low, high), or -1.
+        """
+        tree, popularity = self.tree, self.popularity
+        best = -1
+        low += self.size
+        high += self.size
+        while low < high:
+            if low & 1:
+                if best == -1 or popularity[tree[low]] > popularity[best]:
+                    best = tree[low]
+                low += 1
+            if high & 1:
+                high -= 1
+                if best == -1 or popularity[tree[high]] > popularity[best]:
+                    best = tree[high]
+            low //= 2
+            high //= 2
+        return best
+
+    def top(self, low, high, limit):
+        """
+        Returns up to limit entry indices in [low, high), most popular first,
+        skipping those of people replaced by added entries.
+        """
+        results = []
+        queue = []
+
+        def push(low, high):
+            if low < high:
+                best = self.range_max(low, high)
+                heapq.heappush(
+                    queue, (-self.popularity[best], best, low, high)
+                )
+
+        push(low, high)
+        while queue and len(results) < limit:
+            _, best, low, high = heapq.heappop(queue)
+            if self.person_ids[best] not in self.added:
+                results.append(best)
+            push(low, best)
+            push(best + 1, high)
+        return results
+
+    def exact(self, name, limit=10):
+        """
+        Returns up to limit person_ids with exactly this name, ignoring case.
+        """
+        key = name.lower()
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key, low)
+        added = self.added_range(key, key + "\0")
+        return self.ranked(self.top(low, high, limit), added, limit)
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit person_ids whose name starts with prefix,
+        ignoring case, most popular first.
+        """
+        prefix = prefix.lower()
+        low = bisect_left(self.keys, prefix)
+
+        # Every key starting with prefix sorts before prefix + U+10FFFF
+        high = bisect_left(self.keys, prefix + "\U0010ffff", low)
+        added = self.added_range(prefix, prefix + "\U0010ffff")
+        return self.ranked(self.top(low, high, limit), added, limit)
+
+    def postings(self, gram):
+        i = bisect_left(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return None
+        return self.gram_entries[self.gram_offsets[i]:self.gram_offsets[i + 1]]
+
+    def fuzzy(self, name, limit=10):
+        """
+        Returns up to limit person_ids whose name is most similar to name,
+        tolerating typos, ranked by trigram similarity and then popularity.
+        """
+        query = trigrams(name.lower())
+        lists = [self.postings(gram) for gram in query]
+        lists = sorted((entries for entries in lists if entries is not None),
+                       key=len)
+
+        # Count shared trigrams, skipping very common trigrams
+        # once rarer ones have already produced candidates
+        shared = {}
+        for entries in lists:
+            if len(entries) > MAX_POSTINGS and shared:
+                break
+            for i in entries[:MAX_POSTINGS]:
+                shared[i] = shared.get(i, 0) + 1
+
+        candidates = heapq.nlargest(limit * 10, shared, key=shared.get)
+        candidates = [(self.keys[i], self.person_ids[i], self.popularity[i])
+                      for i in candidates
+                      if self.person_ids[i] not in self.added]
+        added = set()
+        for gram in query:
+            added.update(self.added_grams.get(gram, ()))
+        candidates.extend(self.added[person_id] for person_id in added)
+        scored = []
+        for key, person_id, popularity in candidates:
+            grams = trigrams(key)
+            similarity = 2 * len(query & grams) / (len(query) + len(grams))
+            if similarity >= MIN_SIMILARITY:
+                scored.append((-similarity, -popularity, person_id))
+        scored.sort()
+        return [person_id for _, _, person_id in scored[:limit]]
+
+    def search(self, name, limit=10):
+        """
+        Returns up to limit person_ids for a name: exact matches first,
+        then names starting with it, then names similar to it.
+        """
+        results = []
+        for method in [self.exact, self.prefix, self.fuzzy]:
+            for person_id in method(name, limit):
+                if person_id not in results:
+                    results.append(person_id)
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+
+def load_or_build(directory, entries, people):
+    """
+    Returns the name index for directory, building it from the
+    entries() iterable and saving it if it is missing or out of date.
+
+    People journaled as deltas since the index was saved, or given new
+    movies by them, are added to it with their name and popularity in
+    people, the loaded data with those deltas applied.
+    """
+    index = NameIndex.load(directory)
+    rows, journal = delta.read_journal(directory)
+    if index is not None:
+        rows, _ = delta.read_journal(directory, index.journal)
+        changed = dict.fromkeys(row[1] for row in rows
+                                if row[0] in ("person", "star"))
+        index.add((person_id, people[person_id]["name"],
+                   len(people[person_id]["movies"]))
+                  for person_id in changed if person_id in people)
+        return index
+    index = NameIndex.build(entries(), journal)
+    try:
+        index.save(directory)
+    except OSError:
+        pass
+    return index
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python lookup.py directory [name ...]")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    graph, journal = delta.load_graph(directory)
+    index = NameIndex.build(entries_from_graph(graph), journal)
+    index.save(directory)
+    print(f"Index written to {index_path(directory)}.")
+
+    for name in sys.argv[2:]:
+        start = time.perf_counter()
+        person_ids = index.search(name)
+        elapsed = time.perf_counter() - start
+        print(f"{name} ({elapsed * 1e6:.0f} µs):")
+        for person_id in person_ids:
+            print(f"    {person_id}: {graph.people[person_id]['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import json
+import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+# Number of recent path results kept in the LRU cache
+CACHE_SIZE = 10000
+
+# Number of recent latencies kept per route for percentiles
+LATENCY_WINDOW = 1000
+
+
+class NotFound(Exception):
+    pass
+
+
+class Metrics():
+    """
+    Thread-safe request counts and recent latencies per route.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.latencies = {}
+
+    def record(self, route, seconds):
+        with self.lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+            self.latencies.setdefault(
+                route, deque(maxlen=LATENCY_WINDOW)
+            ).append(seconds)
+
+    def summary(self):
+        with self.lock:
+            routes = {}
+            for route, latencies in self.latencies.items():
+                ordered = sorted(latencies)
+                routes[route] = {
+                    "requests": self.counts[route],
+                    "mean_ms": 1000 * sum(ordered) / len(ordered),
+                    "p50_ms": 1000 * percentile(ordered, 0.50),
+                    "p99_ms": 1000 * percentile(ordered, 0.99),
+                    "max_ms": 1000 * ordered[-1],
+                }
+        info = cached_path.cache_info()
+        return {
+            "routes": routes,
+            "path_cache": {"hits": info.hits, "misses": info.misses,
+                           "size": info.currsize, "max_size": info.maxsize},
+        }
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+metrics = Metrics()
+
+# The degrees.generation of the data that cached paths were found in
+cache_generation = None
+cache_lock = threading.Lock()
+
+
+def clear_stale_paths():
+    """
+    Clears the path cache if the data has been reloaded or changed by
+    degrees.apply_delta since its paths were found.
+    """
+    global cache_generation
+    with cache_lock:
+        if cache_generation != degrees.generation:
+            cached_path.cache_clear()
+            cache_generation = degrees.generation
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def cached_path(source, target):
+    """
+    Returns the shortest path between two person_ids as a tuple,
+    caching recent results.
+    """
+    path = degrees.shortest_path(source, target)
+    return None if path is None else tuple(path)
+
+
+def describe_person(person_id):
+    person = degrees.people[person_id]
+    return {"id": person_id, "name": person["name"], "birth": person["birth"]}
+
+
+def lookup_names(query):
+    name = query.get("q", [""])[0]
+    limit = int(query.get("limit", ["10"])[0])
+    if not name:
+        raise ValueError("missing q")
+    person_ids = degrees.person_ids_for_query(name, limit)
+    return {"query": name,
+            "people": [describe_person(person_id) for person_id in person_ids]}
+
+
+def resolve(query, key):
+    """
+    Returns the person_id given by the key parameter, as an ID or
+    as a name that matches exactly one person.
+    """
+    value = query.get(key, [""])[0]
+    if not value:
+        raise ValueError(f"missing {key}")
+    if value in degrees.people:
+        return value
+    person_ids = degrees.names.get(value.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    if not person_ids:
+        raise NotFound(f"{key} not found: {value}")
+    raise NotFound(f"{key} is ambiguous: {value}")
+
+
+def find_path(query):
+    source, target = resolve(query, "source"), resolve(query, "target")
+    clear_stale_paths()
+    path = cached_path(source, target)
+    if path is None:
+        return {"source": source, "target": target,
+                "degrees": None, "path": None}
+    steps = []
+    person_id = source
+    for movie_id, next_id in path:
+        steps.append({
+            "movie": {"id": movie_id,
+                      "title": degrees.movies[movie_id]["title"]},
+            "from": describe_person(person_id),
+            "to": describe_person(next_id),
+        })
+        person_id = next_id
+    return {"source": source, "target": target,
+            "degrees": len(path), "path": steps}
+
+
+ROUTES = {
+    "/names": lookup_names,
+    "/path": find_path,
+    "/metrics": lambda query: metrics.summary(),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        route = ROUTES.get(url.path)
+        if route is None:
+            status, body = 404, {"error": "not found"}
+        else:
+            try:
+                status, body = 200, route(parse_qs(url.query))
+            except NotFound as e:
+                status, body = 404, {"error": str(e)}
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            except Exception:
+
+                # Such as a KeyError from data changed during the request
+                status, body = 500, {"error": "internal error"}
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        metrics.record(url.path if route else "other",
+                       time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=8000, host="127.0.0.1"):
+    """
+    Returns an HTTP server answering queries against the loaded data,
+    one thread per request. Use port 0 to pick any free port.
+    """
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    args = sys.argv[1:]
+    backend = "dict"
+    use_landmarks = False
+    while args and args[0].startswith("--"):
+        if args[0] == "--csr":
+            backend = "csr"
+        elif args[0] == "--landmarks":
+            backend = "csr"
+            use_landmarks = True
+        else:
+            sys.exit(f"Unknown option {args[0]}")
+        args = args[1:]
+    if len(args) > 2:
+        sys.exit("Usage: python server.py [--csr | --landmarks] "
+                 "[directory] [port]")
+    directory = args[0] if args else "large"
+    port = int(args[1]) if len(args) > 1 else 8000
+
+    print("Loading data...")
+    degrees.load_data(directory, backend, use_landmarks,
+                      use_name_index=True)
+    print("Data loaded.")
+
+    server = make_server(port)
+    print(f"Serving on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+
+from graph import CSRGraph
+
+# Bump whenever the layout below changes, so old snapshots are rebuilt
+VERSION = 1
+MAGIC = b"DEGREES\0"
+FILENAME = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Integer arrays stored as int32
+ARRAYS = [
+    "person_offsets", "person_movies", "movie_offsets", "movie_people",
+    "person_order", "movie_order", "name_order"
+]
+
+# String columns stored as int64 offsets plus a UTF-8 blob
+STRINGS = [
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years"
+]
+
+HEADER = struct.Struct("<8sI")
+STAT = struct.Struct("<qq")
+SECTION = struct.Struct("<qq")
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def source_stats(directory):
+    """
+    Returns the (mtime_ns, size) of each CSV file the graph is built from.
+    """
+    stats = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stats.append((stat.st_mtime_ns, stat.st_size))
+    return stats
+
+
+def section_names():
+    names = list(ARRAYS)
+    for column in STRINGS:
+        names.extend([f"{column}.offsets", f"{column}.blob"])
+    return names
+
+
+def encode_strings(strings):
+    """
+    Returns (offsets, blob) bytes for a list of strings.
+    """
+    offsets = array("q", [0])
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets.tobytes(), bytes(blob)
+
+
+def save(graph, directory):
+    """
+    Writes a snapshot of graph next to the CSV files in directory.
+    """
+    orders = {
+        "person_order": sorted(range(len(graph.person_ids)),
+                               key=lambda i: graph.person_ids[i]),
+        "movie_order": sorted(range(len(graph.movie_ids)),
+                              key=lambda i: graph.movie_ids[i]),
+        "name_order": sorted(range(len(graph.person_names)),
+                             key=lambda i: graph.person_names[i].lower()),
+    }
+    sections = []
+    for name in ARRAYS:
+        values = orders[name] if name in orders else getattr(graph, name)
+        sections.append(array("i", values).tobytes())
+    for column in STRINGS:
+        sections.extend(encode_strings(getattr(graph, column)))
+
+    header = HEADER.pack(MAGIC, VERSION)
+    header += b"".join(STAT.pack(*stat) for stat in source_stats(directory))
+    write_sections(snapshot_path(directory), header, sections)
+
+
+def write_sections(path, header, sections):
+    """
+    Atomically writes a file of header bytes, a table of (offset, length)
+    entries and then the bytes of each section, aligned to 8 bytes.
+    """
+    offset = len(header) + SECTION.size * len(sections)
+    table = b""
+    layout = []
+    for data in sections:
+        offset += -offset % 8
+        table += SECTION.pack(offset, len(data))
+        layout.append((offset, data))
+        offset += len(data)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(header + table)
+        for start, data in layout:
+            f.write(b"\0" * (start - f.tell()))
+            f.write(data)
+    os.replace(temporary, path)
+
+
+def open_sections(path, magic, version, directory, count):
+    """
+    Memory-maps a file written by write_sections, checking its magic,
+    version and CSV stats, and returns its list of count section views.
+
+    Returns None if the file is missing, of another version, or was
+    written from CSV files that have since changed.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        stats = source_stats(directory)
+    except (OSError, ValueError):
+        return None
+
+    offset = HEADER.size + STAT.size * len(SOURCES)
+    if len(buffer) < offset + SECTION.size * count:
+        return None
+    if HEADER.unpack_from(buffer, 0) != (magic, version):
+        return None
+    for i, stat in enumerate(stats):
+        if STAT.unpack_from(buffer, HEADER.size + i * STAT.size) != stat:
+            return None
+
+    view = memoryview(buffer)
+    sections = []
+    for i in range(count):
+        start, length = SECTION.unpack_from(buffer, offset + i * SECTION.size)
+        sections.append(view[start:start + length])
+    return sections
+
+
+def load(directory):
+    """
+    Memory-maps the snapshot in directory and returns its graph.
+
+    Returns None if there is no snapshot, or if it was written by another
+    version or from CSV files that have since changed.
+    """
+    names = section_names()
+    views = open_sections(snapshot_path(directory), MAGIC, VERSION,
+                          directory, len(names))
+    if views is None:
+        return None
+    sections = dict(zip(names, views))
+
+    arrays = {name: sections[name].cast("i") for name in ARRAYS}
+    strings = {
+        column: StringTable(sections[f"{column}.offsets"].cast("q"),
+                            sections[f"{column}.blob"])
+        for column in STRINGS
+    }
+    graph = CSRGraph(
+        strings["person_ids"], strings["person_names"],
+        strings["person_births"], strings["movie_ids"],
+        strings["movie_titles"], strings["movie_years"],
+        arrays["person_offsets"], arrays["person_movies"],
+        arrays["movie_offsets"], arrays["movie_people"],
+        person_index=SortedIndex(strings["person_ids"],
+                                 arrays["person_order"]),
+        movie_index=SortedIndex(strings["movie_ids"], arrays["movie_order"]),
+        name_index=SortedIndex(strings["person_names"], arrays["name_order"],
+                               normalize=str.lower, multi=True)
+    )
+
+    # Keep the mapping open for as long as the graph is alive
+    graph.snapshot = views[0].obj
+    return graph
+
+
+def load_or_build(directory):
+    """
+    Returns the graph for directory, from its snapshot if it is current,
+    or else parsed from the CSV files and snapshotted for the next run.
+    """
+    graph = load(directory)
+    if graph is not None:
+        return graph
+    graph = CSRGraph.from_csv(directory)
+    try:
+        save(graph, directory)
+    except OSError:
+        pass
+    return graph
+
+
+class StringTable(Sequence):
+    """
+    Read-only list of strings decoded on access from a UTF-8 blob.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return str(self.blob[start:end], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class SortedIndex(Mapping):
+    """
+    Maps keys to indices by binary search over an order array that sorts
+    the indices by key. With multi set, maps each key to a list of indices.
+    """
+
+    def __init__(self, keys, order, normalize=None, multi=False):
+        self.keys = keys
+        self.order = order
+        self.normalize = normalize
+        self.multi = multi
+        self.length = None
+
+    def key(self, i):
+        key = self.keys[i]
+        return self.normalize(key) if self.normalize else key
+
+    def __getitem__(self, key):
+        order = self.order
+        i = bisect_left(order, key, key=self.key)
+        matches = []
+        while i < len(order) and self.key(order[i]) == key:
+            matches.append(order[i])
+            i += 1
+        if not matches:
+            raise KeyError(key)
+        return matches if self.multi else matches[0]
+
+    def __iter__(self):
+        previous = None
+        for i in self.order:
+            key = self.key(i)
+            if key != previous:
+                yield key
+                previous = key
+
+    def __len__(self):
+        if not self.multi:
+            return len(self.order)
+        if self.length is None:
+            self.length = sum(1 for _ in self)
+        return self.length
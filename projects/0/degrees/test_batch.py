@@ -0,0 +1,50 @@
+import pytest
+
+import batch
+import degrees
+from util import breadth_first_search
+
+
+def pairs_for(person_ids):
+    """Returns pairs from a few sources to every person, and a few more."""
+    pairs = [(source, target) for source in person_ids[:3]
+             for target in person_ids]
+    pairs += [(person_ids[-1], person_ids[0]), (person_ids[5], person_ids[6])]
+    return pairs
+
+
+@pytest.mark.parametrize("backend", ["dict", "csr"])
+def test_batch_paths_are_shortest(small, backend):
+    degrees.load_data(small, backend)
+    person_ids = sorted(degrees.people, key=int)
+    pairs = pairs_for(person_ids)
+    results = batch.batch_paths(pairs, 1, small, backend)
+    assert [(source, target) for source, target, _ in results] == pairs
+    for source, target, path in results:
+        _, distances = breadth_first_search(source,
+                                            degrees.neighbors_for_person)
+        if target in distances:
+            assert len(path) == distances[target]
+        else:
+            assert path is None
+
+
+def test_workers_match_one_process(small):
+    degrees.load_data(small, "csr")
+    person_ids = sorted(degrees.people, key=int)
+    pairs = pairs_for(person_ids)
+    serial = batch.batch_paths(pairs, 1, small, "csr")
+    pooled = batch.batch_paths(pairs, 2, small, "csr")
+    assert [len(path) if path is not None else None
+            for _, _, path in pooled] == [
+        len(path) if path is not None else None for _, _, path in serial]
+
+
+def test_resolve(small):
+    degrees.load_data(small)
+    assert batch.resolve("7") == "7"
+    assert batch.resolve("person 7") == "7"
+    with pytest.raises(ValueError):
+        batch.resolve("Person 0")
+    with pytest.raises(ValueError):
+        batch.resolve("Nobody")
@@ -0,0 +1,167 @@
+import shutil
+
+import pytest
+
+import degrees
+from util import Node, QueueFrontier, StackFrontier, breadth_first_search
+
+# Delta files adding two people and a movie linking the separate part of
+# the random dataset to the rest, and a star to an existing movie
+DELTA = {
+    "people.csv": "id,name,birth\n9001,New Person,2001\n9002,Other,2002\n",
+    "movies.csv": "id,title,year\n9100,New Movie,2020\n",
+    "stars.csv": ("person_id,movie_id\n"
+                  "9001,9100\n0,9100\n280,9100\n9002,1000\n"),
+}
+
+
+def distances_from(source):
+    """Returns the BFS distances from source by person_id."""
+    _, distances = breadth_first_search(source,
+                                        degrees.neighbors_for_person)
+    return distances
+
+
+def valid(source, target, path):
+    """Checks that each step of a path shares its movie with the last."""
+    person_id = source
+    for movie_id, next_id in path:
+        if (movie_id not in degrees.people[person_id]["movies"]
+                or movie_id not in degrees.people[next_id]["movies"]):
+            return False
+        person_id = next_id
+    return person_id == target
+
+
+def all_lengths(directory, backend):
+    """
+    Returns the length of shortest_path, or None, for every pair of the
+    first sources and every target, checking each path found.
+    """
+    degrees.load_data(directory, backend)
+    person_ids = sorted(degrees.people, key=int)
+    lengths = {}
+    for source in person_ids[::4]:
+        distances = distances_from(source)
+        for target in person_ids:
+            path = degrees.shortest_path(source, target)
+            if path is None:
+                assert target not in distances
+                lengths[(source, target)] = None
+            else:
+                assert len(path) == distances[target]
+                assert valid(source, target, path)
+                lengths[(source, target)] = len(path)
+    return lengths
+
+
+def test_backends_agree_on_all_pairs(small):
+    lengths = all_lengths(small, "dict")
+    assert all_lengths(small, "csr") == lengths
+    assert None in lengths.values()
+
+
+@pytest.mark.parametrize("backend", ["dict", "csr"])
+def test_every_shortest_path_is_found(small, backend):
+    degrees.load_data(small, backend)
+    person_ids = sorted(degrees.people, key=int)
+    for source in person_ids[:40:7]:
+        distances = distances_from(source)
+
+        # Number of shortest paths to each person, counting each movie
+        ways = {source: 1}
+        for target in sorted(distances, key=distances.get)[1:]:
+            ways[target] = sum(
+                ways[person_id]
+                for _, person_id in degrees.neighbors_for_person(target)
+                if distances.get(person_id) == distances[target] - 1
+            )
+        for target in person_ids[::5]:
+            paths = list(degrees.shortest_paths(source, target))
+            if target not in distances:
+                assert paths == []
+                continue
+            assert len(paths) == ways[target]
+            assert len(set(map(tuple, paths))) == len(paths)
+            for path in paths:
+                assert len(path) == distances[target]
+                assert valid(source, target, path)
+    first = next(degrees.shortest_paths(person_ids[0], person_ids[1]), None)
+    assert first is None or valid(person_ids[0], person_ids[1], first)
+
+
+def test_snapshot_matches_csv(small):
+    degrees.load_data(small, "dict")
+    expected = ({name: set(ids) for name, ids in degrees.names.items()},
+                {person_id: dict(person)
+                 for person_id, person in degrees.people.items()},
+                {movie_id: dict(movie)
+                 for movie_id, movie in degrees.movies.items()})
+
+    # Once writing the snapshot, then once memory-mapping it
+    for _ in range(2):
+        degrees.load_data(small, "csr")
+        assert {name: set(degrees.names[name])
+                for name in degrees.names} == expected[0]
+        assert {person_id: dict(degrees.people[person_id])
+                for person_id in degrees.people} == expected[1]
+        assert {movie_id: dict(degrees.movies[movie_id])
+                for movie_id in degrees.movies} == expected[2]
+
+
+def merged_dataset(small, directory):
+    """Copies the dataset in small to directory with DELTA appended."""
+    directory.mkdir()
+    for filename, text in DELTA.items():
+        shutil.copy(f"{small}/{filename}", directory / filename)
+        with open(directory / filename, "a", encoding="utf-8") as f:
+            f.write(text.split("\n", 1)[1])
+    return str(directory)
+
+
+@pytest.mark.parametrize("backend", ["dict", "csr", "landmarks"])
+def test_deltas_match_a_full_reload(small, tmp_path, backend):
+    merged = merged_dataset(small, tmp_path / "merged")
+    delta_directory = tmp_path / "delta"
+    delta_directory.mkdir()
+    for filename, text in DELTA.items():
+        (delta_directory / filename).write_text(text, encoding="utf-8")
+    use_landmarks = backend == "landmarks"
+    backend = "csr" if use_landmarks else backend
+
+    degrees.load_data(merged, "dict")
+    sources = ["0", "280", "9001", "9002", "150"]
+    expected = {source: distances_from(source) for source in sources}
+
+    degrees.load_data(small, backend, use_landmarks, use_name_index=True)
+    degrees.apply_delta(str(delta_directory))
+    assert degrees.person_ids_for_query("New Person")[0] == "9001"
+    for source in sources:
+        assert distances_from(source) == expected[source]
+        for target in ["9001", "9002", "0", "299"]:
+            path = degrees.shortest_path(source, target)
+            if target in expected[source]:
+                assert len(path) == expected[source][target]
+            else:
+                assert path is None
+
+    # Reloading replays the journal the delta was appended to
+    degrees.load_data(small, backend, use_landmarks)
+    for source in sources:
+        assert distances_from(source) == expected[source]
+
+
+def test_frontiers():
+    for frontier, order in [(StackFrontier(), [1, 2, 1, 0]),
+                            (QueueFrontier(), [0, 1, 2, 1])]:
+        for state in [0, 1, 2, 1]:
+            frontier.add(Node(state, None, None))
+        removed = [frontier.remove().state for _ in range(3)]
+        assert frontier.contains_state(order[3])
+        assert not frontier.contains_state(removed[0])
+        removed.append(frontier.remove().state)
+        assert removed == order
+        assert frontier.empty()
+        assert not any(frontier.contains_state(state) for state in range(3))
+        with pytest.raises(Exception):
+            frontier.remove()
@@ -0,0 +1,94 @@
+import degrees
+import delta
+import landmarks
+from util import breadth_first_search
+
+
+def valid(graph, source, target, path):
+    """Checks that each step of a path shares its movie with the last."""
+    person = source
+    for movie, star in path:
+        if movie not in graph.movies_of(person) or (
+            movie not in graph.movies_of(star)
+        ):
+            return False
+        person = star
+    return person == target
+
+
+def counting(movies_of):
+    """
+    Returns movies_of wrapped to count the people it is called on, which
+    the search does once for each person it expands, and the list it
+    counts into.
+    """
+    calls = []
+
+    def counted(person):
+        calls.append(person)
+        return movies_of(person)
+    return counted, calls
+
+
+def test_paths_as_short_as_bfs(small):
+    graph, _ = delta.load_graph(small)
+    index = landmarks.LandmarkIndex.build(graph, count=8)
+    for source in range(0, len(graph.person_ids), 7):
+        _, distances = breadth_first_search(source, graph.neighbors)
+        for target in range(len(graph.person_ids)):
+            path = index.shortest_path(graph, source, target)
+            if target not in distances:
+                assert path is None
+                continue
+            assert len(path) == distances[target]
+            assert valid(graph, source, target, path)
+
+            lower, upper = index.bounds(source, target)
+            assert lower <= distances[target]
+            assert upper is None or distances[target] <= upper
+
+
+def test_search_expands_fewer_people_than_bfs(small):
+    graph, _ = delta.load_graph(small)
+    index = landmarks.LandmarkIndex.build(graph, count=8)
+    graph.movies_of, calls = counting(graph.movies_of)
+
+    # People BFS expands before reaching each target, against the
+    # people the guided search expands, over pairs it has to search
+    bfs = searched = 0
+    for source in range(0, len(graph.person_ids), 11):
+        _, distances = breadth_first_search(source, graph.neighbors)
+        for target, depth in distances.items():
+            lower, upper = index.bounds(source, target)
+            if lower == upper:
+                continue
+            bfs += sum(1 for distance in distances.values()
+                       if distance < depth)
+            calls.clear()
+            index.shortest_path(graph, source, target)
+            searched += len(calls)
+    assert searched < bfs / 2
+
+
+def test_index_survives_save_and_load(small):
+    graph, _ = delta.load_graph(small)
+    index = landmarks.load_or_build(graph, small, count=8)
+    loaded = landmarks.LandmarkIndex.load(small)
+    assert list(loaded.landmarks) == list(index.landmarks)
+    assert bytes(loaded.distances) == bytes(index.distances)
+    for target in range(0, len(graph.person_ids), 13):
+        assert loaded.bounds(0, target) == index.bounds(0, target)
+
+
+def test_degrees_uses_the_index(small):
+    degrees.load_data(small, "csr", use_landmarks=True)
+    graph = degrees.graph
+    assert degrees.landmark_index is not None
+    source = graph.person_ids[0]
+    _, distances = breadth_first_search(0, graph.neighbors)
+    for target in range(len(graph.person_ids)):
+        path = degrees.shortest_path(source, graph.person_ids[target])
+        if target in distances:
+            assert len(path) == distances[target]
+        else:
+            assert path is None
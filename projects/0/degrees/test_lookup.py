@@ -0,0 +1,59 @@
+import random
+
+import lookup
+
+FIRST = ["Kevin", "Kevin", "Tom", "Emma", "Emily", "Tomas", "Anne", "Ann"]
+LAST = ["Bacon", "Hanks", "Watson", "Stone", "Baker", "Cruise", "Hank"]
+
+
+def random_entries(rng, count, start=0):
+    """Returns count (person_id, name, popularity) entries."""
+    return [(str(start + i), f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+             rng.randrange(100)) for i in range(count)]
+
+
+def popularity_of(entries, person_ids):
+    popularity = {person_id: count for person_id, _, count in entries}
+    return [popularity[person_id] for person_id in person_ids]
+
+
+def test_added_names_are_searched_like_indexed_ones():
+    rng = random.Random(0)
+    entries = random_entries(rng, 300)
+    index = lookup.NameIndex.build(entries)
+
+    # New people, then existing people renamed or given new movies, once
+    # and then again, against an index built with every change in it
+    added = random_entries(rng, 40, start=300)
+    added += [(person_id, f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+               rng.randrange(100))
+              for person_id, _, _ in rng.sample(entries + added, 60)]
+    for entry in added:
+        index.add([entry])
+    merged = list({entry[0]: entry for entry in entries + added}.values())
+    rebuilt = lookup.NameIndex.build(merged)
+
+    for name in ["Kevin Bacon", "tom hanks", "Emma Stone", "Ann Baker"]:
+        found = index.exact(name, 5)
+        assert all(entry[1].lower() == name.lower()
+                   for entry in merged if entry[0] in found)
+        assert (popularity_of(merged, found)
+                == popularity_of(merged, rebuilt.exact(name, 5)))
+    for prefix in ["k", "Tom", "emm", "Ann B", "Z"]:
+        found = index.prefix(prefix, 5)
+        assert (popularity_of(merged, found)
+                == popularity_of(merged, rebuilt.prefix(prefix, 5)))
+    for typo in ["Kevn Bacon", "Tom Hnks", "Ema Ston"]:
+        assert index.fuzzy(typo, 5) == rebuilt.fuzzy(typo, 5)
+
+
+def test_renamed_people_are_not_found_by_old_name():
+    index = lookup.NameIndex.build([("1", "Kevin Bacon", 50),
+                                    ("2", "Tom Hanks", 40)])
+    index.add([("1", "Kevin Bacon", 60)])
+    index.add([("1", "Francis Bacon", 70)])
+    assert index.exact("Kevin Bacon") == []
+    assert index.exact("Francis Bacon") == ["1"]
+    assert index.prefix("kevin") == []
+    assert index.search("Francis Bacn") == ["1"]
+    assert "1" not in index.fuzzy("Kevin Hanks")
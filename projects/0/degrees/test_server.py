@@ -0,0 +1,96 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+import degrees
+import server
+
+# A tiny dataset: Alice and Carol are linked through Bob by two movies
+DATASET = {
+    "people.csv": ("id,name,birth\n"
+                   "1,Alice Smith,1970\n"
+                   "2,Bob Jones,1980\n"
+                   "3,Carol Smith,1990\n"
+                   "4,Dan Alone,2000\n"),
+    "movies.csv": ("id,title,year\n"
+                   "10,First Movie,2000\n"
+                   "11,Second Movie,2001\n"),
+    "stars.csv": ("person_id,movie_id\n"
+                  "1,10\n"
+                  "2,10\n"
+                  "2,11\n"
+                  "3,11\n"),
+}
+
+
+def write(directory, files):
+    for filename, text in files.items():
+        (directory / filename).write_text(text, encoding="utf-8")
+
+
+@pytest.fixture(params=["dict", "csr"])
+def get(request, tmp_path):
+    """
+    Serves the tiny dataset on a free port with each backend, and returns
+    a function giving (status, JSON body) of a GET request to it.
+    """
+    write(tmp_path, DATASET)
+    degrees.load_data(str(tmp_path), request.param, use_name_index=True)
+    server.metrics = server.Metrics()
+    httpd = server.make_server(port=0)
+    port = httpd.server_address[1]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    def get(path):
+        try:
+            with urlopen(f"http://127.0.0.1:{port}{path}") as response:
+                return response.status, json.load(response)
+        except HTTPError as e:
+            return e.code, json.load(e)
+    yield get
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_paths(get):
+    status, body = get("/path?source=1&target=3")
+    assert status == 200
+    assert body["degrees"] == 2
+    assert body["path"][0]["movie"]["title"] == "First Movie"
+    status, body = get("/path?source=Alice%20Smith&target=carol%20smith")
+    assert (status, body["degrees"]) == (200, 2)
+    status, body = get("/path?source=1&target=4")
+    assert (status, body["degrees"]) == (200, None)
+
+
+def test_errors(get):
+    assert get("/path?source=1")[0] == 400
+    assert get("/path?source=1&target=Nobody")[0] == 404
+    assert get("/names?q=smith&limit=many")[0] == 400
+    assert get("/nowhere")[0] == 404
+
+
+def test_names_and_metrics(get):
+    status, body = get("/names?q=smith")
+    assert status == 200
+    assert {person["id"] for person in body["people"]} == {"1", "3"}
+    get("/path?source=1&target=3")
+    get("/path?source=1&target=3")
+    status, body = get("/metrics")
+    assert status == 200
+    assert body["routes"]["/path"]["requests"] == 2
+    assert body["path_cache"]["hits"] == 1
+
+
+def test_deltas_clear_cached_paths(get, tmp_path):
+    assert get("/path?source=1&target=4")[1]["degrees"] is None
+    delta_directory = tmp_path / "delta"
+    delta_directory.mkdir()
+    write(delta_directory, {"stars.csv": "person_id,movie_id\n4,11\n"})
+    degrees.apply_delta(str(delta_directory))
+    assert get("/path?source=1&target=4")[1]["degrees"] == 2
+    assert get("/path?source=3&target=4")[1]["degrees"] == 1
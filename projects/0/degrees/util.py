@@ -1,3 +1,7 @@
+import heapq
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -6,14 +10,23 @@ class Node():
 
 
 class StackFrontier():
+    """
+    Last-in first-out frontier.
+
+    Nodes are kept in a deque, and a count of the nodes of each state
+    makes contains_state O(1), so states must be hashable.
+    """
+
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,17 +35,236 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node)
             return node
 
+    def discard(self, node):
+        """Forgets the state of a node taken off the frontier."""
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+
 
 class QueueFrontier(StackFrontier):
+    """
+    First-in first-out frontier.
+    """
 
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node)
             return node
+
+
+class PriorityFrontier(StackFrontier):
+    """
+    Best-first frontier, removing the node with the lowest priority(node),
+    and the earliest added among equals. For A*, priority returns the
+    path cost so far plus the heuristic estimate.
+    """
+
+    def __init__(self, priority):
+        super().__init__()
+        self.frontier = []
+        self.priority = priority
+        self.counter = 0
+
+    def add(self, node):
+        self.counter += 1
+        heapq.heappush(self.frontier,
+                       (self.priority(node), self.counter, node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = heapq.heappop(self.frontier)[2]
+            self.discard(node)
+            return node
+
+
+def bidirectional_search(source, target, neighbors, limit=None):
+    """
+    Returns the shortest list of (action, state) pairs leading from source
+    to target, where neighbors(state) yields (action, state) pairs.
+
+    If no possible path (of at most limit steps, if given), returns None.
+    """
+    if source == target:
+        return []
+
+    # Map each reached state to the (action, state) step that led
+    # to it, one map growing from the source and one from the target
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = deque([source])
+    backward_frontier = deque([target])
+    forward_depth = backward_depth = 0
+
+    while forward_frontier and backward_frontier:
+        if limit is not None and forward_depth + backward_depth >= limit:
+            return None
+
+        # Always expand the smaller frontier by one full layer
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_depth += 1
+            meeting = expand_layer(
+                forward_frontier, forward, backward, neighbors
+            )
+        else:
+            backward_depth += 1
+            meeting = expand_layer(
+                backward_frontier, backward, forward, neighbors
+            )
+
+        if meeting is not None:
+            return build_path(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(frontier, parents, other_parents, neighbors):
+    """
+    Expands every state in the current layer of a frontier.
+
+    Returns the first state reached from both sides, or None.
+    """
+    for _ in range(len(frontier)):
+        state = frontier.popleft()
+        for action, neighbor in neighbors(state):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (action, state)
+            if neighbor in other_parents:
+                return neighbor
+            frontier.append(neighbor)
+    return None
+
+
+def build_path(meeting, forward, backward):
+    """
+    Rebuilds the (action, state) path through the meeting state
+    from the parent pointers of both searches.
+    """
+    path = path_to(forward, meeting)
+    state = meeting
+    while backward[state] is not None:
+        action, following = backward[state]
+        path.append((action, following))
+        state = following
+
+    return path
+
+
+def breadth_first_search(source, neighbors, targets=None):
+    """
+    Runs a single BFS from source, where neighbors(state) yields
+    (action, state) pairs.
+
+    Returns (parents, distances): the (action, state) step leading to every
+    reached state, and its distance from source. If targets is given, the
+    search stops as soon as all of them have been reached.
+    """
+    parents = {source: None}
+    distances = {source: 0}
+    remaining = None if targets is None else set(targets) - {source}
+    frontier = deque([source])
+
+    while frontier and (remaining is None or remaining):
+        state = frontier.popleft()
+        distance = distances[state] + 1
+        for action, neighbor in neighbors(state):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (action, state)
+            distances[neighbor] = distance
+            frontier.append(neighbor)
+            if remaining is not None:
+                remaining.discard(neighbor)
+
+    return parents, distances
+
+
+def path_to(parents, target):
+    """
+    Returns the (action, state) path to target from BFS parent pointers,
+    or None if target was not reached.
+    """
+    if target not in parents:
+        return None
+    path = []
+    while parents[target] is not None:
+        action, previous = parents[target]
+        path.append((action, target))
+        target = previous
+    path.reverse()
+    return path
+
+
+def shortest_path_dag(source, target, neighbors):
+    """
+    Runs a BFS from source through the layer of target, recording for every
+    reached state all of its (action, state) predecessors one layer closer
+    to source.
+
+    Returns the predecessor lists, or None if target cannot be reached.
+    """
+    parents = {source: []}
+    depths = {source: 0}
+    frontier = [source]
+
+    while frontier and target not in depths:
+        next_frontier = []
+        for state in frontier:
+            depth = depths[state] + 1
+            for action, neighbor in neighbors(state):
+                if neighbor not in depths:
+                    depths[neighbor] = depth
+                    parents[neighbor] = [(action, state)]
+                    next_frontier.append(neighbor)
+                elif depths[neighbor] == depth:
+                    parents[neighbor].append((action, state))
+        frontier = next_frontier
+
+    return parents if target in depths else None
+
+
+def dag_paths(parents, source, target):
+    """
+    Lazily yields every (action, state) path from source to target in a
+    predecessor DAG built by shortest_path_dag.
+
+    Walks back from target depth-first, so only the current path is held
+    in memory however many paths there are.
+    """
+    if source == target:
+        yield []
+        return
+
+    # steps[i] leads into states[i] from the state after it
+    states = [target]
+    steps = []
+    stack = [iter(parents[target])]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            states.pop()
+            if steps:
+                steps.pop()
+            continue
+        action, previous = step
+        steps.append((action, states[-1]))
+        if previous == source:
+            yield steps[::-1]
+            steps.pop()
+            continue
+        states.append(previous)
+        stack.append(iter(parents[previous]))
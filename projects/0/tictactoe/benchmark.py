@@ -0,0 +1,204 @@
+import copy
+import math
+import sys
+import time
+
+import bitboard
+import bookfile
+import mnk
+import tictactoe as ttt
+from stats import Stats
+
+# Engines compared against the reference search
+ENGINES = {"lists": ttt, "bitboard": bitboard}
+
+
+def reference_minimax(board):
+    """
+    Reference alpha-beta search over copied boards without a
+    transposition table, used as the baseline that minimax is
+    compared against.
+    """
+    if ttt.terminal(board):
+        return None
+
+    def result(board, action):
+        board_copy = copy.deepcopy(board)
+        if action not in ttt.actions(board):
+            raise ValueError
+        board_copy[action[0]][action[1]] = ttt.player(board)
+        return board_copy
+
+    def max_value(board, alpha, beta):
+        if ttt.terminal(board):
+            return ttt.utility(board), None
+        v, move = -math.inf, None
+        for action in ttt.actions(board):
+            min_v = min_value(result(board, action), alpha, beta)[0]
+            if min_v > v:
+                v, move = min_v, action
+                alpha = max(alpha, v)
+            if beta <= alpha:
+                break
+        return v, move
+
+    def min_value(board, alpha, beta):
+        if ttt.terminal(board):
+            return ttt.utility(board), None
+        v, move = math.inf, None
+        for action in ttt.actions(board):
+            max_v = max_value(result(board, action), alpha, beta)[0]
+            if max_v < v:
+                v, move = max_v, action
+                beta = min(beta, v)
+            if alpha >= beta:
+                break
+        return v, move
+
+    if ttt.player(board) == ttt.X:
+        return max_value(board, -math.inf, math.inf)[1]
+    return min_value(board, -math.inf, math.inf)[1]
+
+
+def board_value(board):
+    return ttt.value(tuple(ttt.DIGITS[cell] for row in board for cell in row))
+
+
+def check_moves(engine):
+    """
+    Checks over every reachable position that the engine's minimax picks
+    a move keeping the position's minimax value, and that its terminal
+    and winner agree with tictactoe.py. Returns the number checked.
+    """
+    checked = 0
+    seen = set()
+    boards = [ttt.initial_state()]
+    while boards:
+        board = boards.pop()
+        key = str(board)
+        if (engine.terminal(board) != ttt.terminal(board)
+                or engine.winner(board) != ttt.winner(board)):
+            sys.exit(f"Engines disagree on {board}")
+        if key in seen or ttt.terminal(board):
+            continue
+        seen.add(key)
+        move = engine.minimax(board)
+        if board_value(ttt.result(board, move)) != board_value(board):
+            sys.exit(f"Suboptimal move {move} on {board}")
+        checked += 1
+        boards.extend(ttt.result(board, action)
+                      for action in ttt.actions(board))
+    return checked
+
+
+def self_play(engine):
+    """
+    Plays one game of the engine's minimax against itself,
+    returning the winner.
+    """
+    board = engine.initial_state()
+    while not engine.terminal(board):
+        board = engine.result(board, engine.minimax(board))
+    return engine.winner(board)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def cold_search(stats=None, repeat=20):
+    """
+    Returns the seconds taken by repeat first moves on an empty board
+    searched from an empty table, without the opening book.
+    """
+    elapsed = 0
+    for _ in range(repeat):
+        ttt.transpositions.clear()
+        elapsed += timed(ttt.minimax, ttt.initial_state(), stats)
+    return elapsed
+
+
+def mnk_search(stats=None, depth=5):
+    """
+    Returns the seconds taken by a depth-limited search of an empty
+    5,5,4 board from an empty table.
+    """
+    game = mnk.Game(5, 5, 4)
+    search = mnk.Search(game, game.initial_state(), math.inf, stats=stats)
+    elapsed = timed(search.negamax, depth, 0, -mnk.WIN - 1, mnk.WIN + 1)
+    if stats is not None:
+        stats.time += elapsed
+    return elapsed
+
+
+def stats_report():
+    """
+    Prints the statistics of a cold search and a 5,5,4 search, and the
+    overhead of collecting them.
+    """
+    book, ttt.opening_book = ttt.opening_book, {}
+    stats = Stats()
+    cold_search(stats, 1)
+    print(f"Cold tictactoe search (win cutoffs): {stats}")
+    off, on = cold_search(), cold_search(Stats())
+    print(f"Overhead of statistics: {100 * (on / off - 1):.1f}%")
+
+    stats = Stats()
+    mnk_search(stats)
+    print(f"5,5,4 search to depth 5 (alpha-beta cutoffs): {stats}")
+    off, on = mnk_search(), mnk_search(Stats())
+    print(f"Overhead of statistics: {100 * (on / off - 1):.1f}%")
+    ttt.opening_book = book
+
+
+def main():
+    if sys.argv[1:] == ["--stats"]:
+        stats_report()
+        return
+
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    empty = ttt.initial_state()
+
+    print("Time to first move on an empty board")
+    before = timed(reference_minimax, empty)
+    print(f"{'reference':>16}: {before * 1000:9.2f} ms")
+
+    # Search without the opening book, then look moves up in it
+    book, ttt.opening_book = ttt.opening_book, {}
+    for name, engine in ENGINES.items():
+        engine.transpositions.clear()
+        cold = timed(engine.minimax, empty)
+        warm = timed(engine.minimax, empty)
+        print(f"{name + ' cold':>16}: {cold * 1000:9.2f} ms "
+              f"({len(engine.transpositions)} positions)")
+        print(f"{name + ' warm':>16}: {warm * 1000:9.2f} ms "
+              f"(speedup {before / cold:.1f}x cold, "
+              f"{before / warm:.1f}x warm)")
+    ttt.opening_book = book
+    if book:
+        load = timed(bookfile.load)
+        lookup = timed(ttt.minimax, empty)
+        print(f"{'book load':>16}: {load * 1000:9.2f} ms "
+              f"({len(book)} positions)")
+        print(f"{'book lookup':>16}: {lookup * 1000:9.2f} ms")
+
+    # Without the opening book, which only the lists engine has
+    print(f"{games} self-play games")
+    ttt.opening_book = {}
+    for name, engine in ENGINES.items():
+        start = time.perf_counter()
+        for _ in range(games):
+            self_play(engine)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>16}: {elapsed / games * 1000:9.2f} ms per game")
+    ttt.opening_book = book
+
+    for name, engine in ENGINES.items():
+        print(f"Checked {check_moves(engine)} positions: "
+              f"every {name} move is optimal")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Tic Tac Toe Player on bitboards
+
+The same public functions as tictactoe.py, on the same list-of-lists
+boards, backed by an engine that stores a board as two 9-bit integers:
+one with a bit set for every X and one for every O, where cell (i, j)
+is bit 3 * i + j.
+"""
+
+import time
+
+from tictactoe import X, O, EMPTY, TRANSFORMS
+
+FULL = 0b111111111
+
+# Bits of each row, column and diagonal
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+
+def symmetry_table(transform):
+    """
+    Returns a table mapping every 9-bit set of cells to the same cells
+    on the board transformed by one of tictactoe.TRANSFORMS.
+    """
+    targets = [3 * transform(k // 3, k % 3)[0] + transform(k // 3, k % 3)[1]
+               for k in range(9)]
+    table = []
+    for bits in range(FULL + 1):
+        moved = 0
+        for k in range(9):
+            if bits >> k & 1:
+                moved |= 1 << targets[k]
+        table.append(moved)
+    return table
+
+
+SYMMETRIES = [symmetry_table(transform) for transform in TRANSFORMS]
+
+# Maps canonical (x, o) keys to the minimax value for the player to move,
+# kept for the whole process like tictactoe.transpositions
+transpositions = {}
+
+
+def won(bits):
+    """
+    Returns True if the cells in bits complete a line.
+    """
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def free_cells(x, o):
+    """
+    Yields the bit of every empty cell, lowest first.
+    """
+    free = FULL & ~(x | o)
+    while free:
+        bit = free & -free
+        yield bit
+        free ^= bit
+
+
+class BitBoard():
+    """
+    Mutable board of two 9-bit integers, where moves are made and
+    unmade in place rather than by copying.
+    """
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_board(cls, board):
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (3 * i + j)
+                elif cell == O:
+                    o |= 1 << (3 * i + j)
+        return cls(x, o)
+
+    def to_board(self):
+        board = []
+        for i in range(3):
+            row = []
+            for j in range(3):
+                bit = 1 << (3 * i + j)
+                row.append(X if self.x & bit else O if self.o & bit else EMPTY)
+            board.append(row)
+        return board
+
+    def x_to_move(self):
+        return self.x.bit_count() == self.o.bit_count()
+
+    def make(self, bit):
+        if self.x_to_move():
+            self.x |= bit
+        else:
+            self.o |= bit
+
+    def unmake(self, bit):
+        if self.x & bit:
+            self.x ^= bit
+        else:
+            self.o ^= bit
+
+    def canonical(self):
+        """
+        Returns the same key for the board and all of its rotations
+        and reflections.
+        """
+        x, o = self.x, self.o
+        return min((table[x] << 9) | table[o] for table in SYMMETRIES)
+
+    def negamax(self, ply=0, stats=None):
+        """
+        Returns the minimax value of the board for the player to move:
+        1 if they win with best play, -1 if they lose, 0 for a draw.
+
+        The search is recorded in stats, a stats.Stats, if one is given,
+        as tictactoe.value does.
+        """
+        if stats is not None:
+            stats.node(ply)
+        key = self.canonical()
+        if key in transpositions:
+            if stats is not None:
+                stats.table_hit(ply)
+            return transpositions[key]
+
+        # The player who just moved is the only one who can have won
+        if won(self.o if self.x_to_move() else self.x):
+            v = -1
+        elif self.x | self.o == FULL:
+            v = 0
+        else:
+            v = -1
+            for bit in free_cells(self.x, self.o):
+                self.make(bit)
+                v = max(v, -self.negamax(ply + 1, stats))
+                self.unmake(bit)
+                if v == 1:
+                    if stats is not None:
+                        stats.cutoff(ply)
+                    break
+
+        transpositions[key] = v
+        return v
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return [[EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if BitBoard.from_board(board).x_to_move() else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    bits = BitBoard.from_board(board)
+    return {divmod(bit.bit_length() - 1, 3)
+            for bit in free_cells(bits.x, bits.o)}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    bits = BitBoard.from_board(board)
+    if not action or action not in actions(board):
+        raise ValueError
+    bits.make(1 << (3 * action[0] + action[1]))
+    return bits.to_board()
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    bits = BitBoard.from_board(board)
+    if won(bits.x):
+        return X
+    elif won(bits.o):
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    bits = BitBoard.from_board(board)
+    return won(bits.x) or won(bits.o) or bits.x | bits.o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return {X: 1, O: -1, None: 0}[winner(board)]
+
+
+def minimax(board, stats=None):
+    """
+    Returns the optimal action for the current player on the board.
+
+    If stats, a stats.Stats, is given, the nodes, win cutoffs and table
+    hits of the search are recorded in it by ply, with its time.
+    """
+    if terminal(board):
+        return None
+    if stats is not None:
+        start = time.perf_counter()
+        stats.node(0)
+
+    bits = BitBoard.from_board(board)
+    best_action = None
+    best = None
+    for bit in free_cells(bits.x, bits.o):
+        bits.make(bit)
+        v = -bits.negamax(1, stats)
+        bits.unmake(bit)
+        if best is None or v > best:
+            best, best_action = v, divmod(bit.bit_length() - 1, 3)
+    if stats is not None:
+        stats.time += time.perf_counter() - start
+    return best_action
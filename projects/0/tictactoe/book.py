@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+
+import tictactoe as ttt
+from bookfile import FILENAME, load, save
+
+def positions():
+    """
+    Yields the cell digits of one board for every non-terminal position
+    reachable from the empty board, up to rotations and reflections.
+    """
+    seen = set()
+    stack = [(0,) * 9]
+    while stack:
+        cells = stack.pop()
+        key = ttt.canonical(cells)
+        if key in seen:
+            continue
+        seen.add(key)
+        board = [[ttt.EMPTY if digit == 0 else ttt.X if digit == 1 else ttt.O
+                  for digit in cells[i:i + 3]] for i in range(0, 9, 3)]
+        if ttt.terminal(board):
+            continue
+        yield cells
+        turn = ttt.DIGITS[ttt.player(board)]
+        stack.extend(cells[:k] + (turn,) + cells[k + 1:]
+                     for k in range(9) if cells[k] == 0)
+
+
+def solve(cells):
+    """
+    Returns (move, value) for the cell digits of a non-terminal board:
+    the lowest cell keeping the board's minimax value, and that value.
+    """
+    turn = 1 if cells.count(1) == cells.count(2) else 2
+    best = None
+    for k in range(9):
+        if cells[k] != 0:
+            continue
+        v = ttt.value(cells[:k] + (turn,) + cells[k + 1:])
+        if turn == 2:
+            v = -v
+        if best is None or v > best[1]:
+            best = (k, v)
+    move, v = best
+    return move, v if turn == 1 else -v
+
+
+def build():
+    """
+    Solves every position, returning a dict mapping canonical keys to
+    (move, value), where move is a cell of the canonical board and
+    value is 1 if X wins with best play, -1 if O wins, 0 for a draw.
+    """
+    entries = {}
+    for cells in positions():
+        key, symmetry = ttt.orient(cells)
+        canonical = tuple(cells[cell] for cell in ttt.SYMMETRIES[symmetry])
+        entries[key] = solve(canonical)
+    return entries
+
+
+def validate(entries):
+    """
+    Compares every book entry against a live search from an empty
+    transposition table. Returns the list of keys that disagree.
+    """
+    ttt.transpositions.clear()
+    wrong = []
+    for cells in positions():
+        key, symmetry = ttt.orient(cells)
+        if key not in entries:
+            wrong.append(key)
+            continue
+        move, v = entries[key]
+        canonical = tuple(cells[cell] for cell in ttt.SYMMETRIES[symmetry])
+        turn = 1 if cells.count(1) == cells.count(2) else 2
+        played = canonical[:move] + (turn,) + canonical[move + 1:]
+        if (canonical[move] != 0 or ttt.value(canonical) != v
+                or ttt.value(played) != v):
+            wrong.append(key)
+    return wrong
+
+
+def main():
+    if sys.argv[1:] not in [[], ["--validate"]]:
+        sys.exit("Usage: python book.py [--validate]")
+
+    if sys.argv[1:] == ["--validate"]:
+        start = time.perf_counter()
+        entries = load()
+        elapsed = time.perf_counter() - start
+        if not entries:
+            sys.exit(f"No opening book at {FILENAME}.")
+        wrong = validate(entries)
+        print(f"Loaded {len(entries)} entries in {elapsed * 1000:.2f} ms.")
+        if wrong:
+            sys.exit(f"{len(wrong)} entries disagree with live search.")
+        print("Every entry agrees with live search.")
+        return
+
+    start = time.perf_counter()
+    entries = build()
+    save(entries)
+    elapsed = time.perf_counter() - start
+    print(f"Solved {len(entries)} positions in {elapsed * 1000:.0f} ms.")
+    print(f"Book written to {FILENAME} ({os.path.getsize(FILENAME)} bytes).")
+
+
+if __name__ == "__main__":
+    main()
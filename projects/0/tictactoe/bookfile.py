@@ -0,0 +1,65 @@
+"""
+Opening book file format, shared by book.py, which builds the book, and
+tictactoe.py, which loads it once when imported.
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+VERSION = 1
+MAGIC = b"TTTBOOK\0"
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "tictactoe.book")
+
+# Magic, version and number of entries, followed by the entries' keys
+# as uint16, move cells as uint8 and values as int8, sorted by key
+HEADER = struct.Struct("<8sII")
+
+
+def save(entries, path=FILENAME):
+    """
+    Writes a dict of canonical keys to (move, value) as the book at path,
+    replacing any previous book at once.
+    """
+    keys = sorted(entries)
+    moves = array("B", [entries[key][0] for key in keys])
+    values = array("b", [entries[key][1] for key in keys])
+    keys = array("H", keys)
+    if sys.byteorder == "big":
+        keys.byteswap()
+    data = HEADER.pack(MAGIC, VERSION, len(keys))
+    data += keys.tobytes() + moves.tobytes() + values.tobytes()
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def load(path=FILENAME):
+    """
+    Returns the opening book's dict of canonical keys to (move, value),
+    or an empty dict if the book is missing or of another version.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return {}
+    if len(data) < HEADER.size:
+        return {}
+    magic, version, count = HEADER.unpack_from(data)
+    if (magic, version) != (MAGIC, VERSION):
+        return {}
+    if len(data) != HEADER.size + 4 * count:
+        return {}
+
+    offset = HEADER.size
+    keys = array("H", data[offset:offset + 2 * count])
+    moves = array("B", data[offset + 2 * count:offset + 3 * count])
+    values = array("b", data[offset + 3 * count:])
+    if sys.byteorder == "big":
+        keys.byteswap()
+    return {key: (move, v) for key, move, v in zip(keys, moves, values)}
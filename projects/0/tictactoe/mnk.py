@@ -0,0 +1,372 @@
+"""
+m,n,k Game Player
+
+Tic Tac Toe generalized to a board of m rows and n columns, won by the
+first player to get k in a row. Larger boards cannot be solved by plain
+minimax, so moves are chosen by iterative deepening alpha-beta search
+with a heuristic evaluation, under a per-move time budget.
+"""
+
+import sys
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position, less the number of plies it took to win
+WIN = 1000000
+
+# Seconds per move searched by default
+TIME_LIMIT = 1.0
+
+# Nodes searched between checks of the time budget
+CHECK_INTERVAL = 1024
+
+
+class Timeout(Exception):
+    pass
+
+
+class Game():
+    """
+    Rules and search of an m,n,k game, with the same functions as
+    tictactoe.py on boards of m lists of n cells.
+
+    The search works on a flat list of cells, 0 for empty, 1 for X and
+    2 for O, updated in place with per-line piece counts.
+    """
+
+    X = X
+    O = O
+    EMPTY = EMPTY
+
+    def __init__(self, m=3, n=3, k=3):
+        if not 0 < k <= max(m, n):
+            raise ValueError(f"cannot get {k} in a row on a {m}x{n} board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.size = m * n
+
+        # Cells of every line of k cells, and the lines through each cell
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.lines.append([(i + di * s) * n + j + dj * s
+                                           for s in range(k)])
+        self.cell_lines = [[] for _ in range(self.size)]
+        for line, cells in enumerate(self.lines):
+            for cell in cells:
+                self.cell_lines[cell].append(line)
+
+        # Heuristic value of a line holding c pieces of one player only
+        self.weights = [0] + [4 ** c for c in range(1, k + 1)]
+
+        # Cells ordered from the center out, for move ordering ties
+        center_i, center_j = (m - 1) / 2, (n - 1) / 2
+        self.central = sorted(
+            range(self.size),
+            key=lambda c: abs(c // n - center_i) + abs(c % n - center_j)
+        )
+
+        # Search results kept across moves: (depth, value, flag, move)
+        self.transpositions = {}
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        cells = [cell for row in board for cell in row]
+        return O if cells.count(X) > cells.count(O) else X
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.m) for j in range(self.n)
+                if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        if not action or action not in self.actions(board):
+            raise ValueError
+        board_copy = [list(row) for row in board]
+        board_copy[action[0]][action[1]] = self.player(board)
+        return board_copy
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for line in self.lines:
+            first = cells[line[0]]
+            if first != EMPTY and all(cells[c] == first for c in line):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None
+                or all(cell != EMPTY for row in board for cell in row))
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        return {X: 1, O: -1, None: 0}[self.winner(board)]
+
+    def minimax(self, board, time_limit=TIME_LIMIT, stop=None, stats=None):
+        """
+        Returns the best action found for the current player on the board
+        within time_limit seconds, searching one ply deeper at a time.
+
+        Setting the optional threading.Event stop ends the search early,
+        as if its time had run out. If stats, a stats.Stats, is given,
+        the nodes, cutoffs and table hits of the search are recorded in
+        it by ply, with the time taken by each completed depth.
+        """
+        if self.terminal(board):
+            return None
+        search = Search(self, board, time_limit, stop, stats)
+        move = search.run()
+        return divmod(move, self.n)
+
+
+class Search():
+    """
+    Iterative deepening negamax with alpha-beta pruning, a transposition
+    table, killer moves and the history heuristic.
+    """
+
+    def __init__(self, game, board, time_limit, stop=None, stats=None):
+        self.game = game
+        self.cells = [{EMPTY: 0, X: 1, O: 2}[cell]
+                      for row in board for cell in row]
+        self.turn = 2 if self.cells.count(1) > self.cells.count(2) else 1
+        self.empty = self.cells.count(0)
+
+        # Pieces of each player on every line, indexed by player
+        self.counts = [None, [0] * len(game.lines), [0] * len(game.lines)]
+        for line, cells in enumerate(game.lines):
+            for cell in cells:
+                if self.cells[cell]:
+                    self.counts[self.cells[cell]][line] += 1
+
+        # Bitmasks of each player's pieces, which key the table
+        self.bits = [None, 0, 0]
+        for cell, piece in enumerate(self.cells):
+            if piece:
+                self.bits[piece] |= 1 << cell
+
+        self.deadline = time.perf_counter() + time_limit
+        self.stop = stop
+        self.stats = stats
+        self.nodes = 0
+        self.killers = {}
+        self.history = [0] * game.size
+        self.depth = 0
+
+    def make(self, cell):
+        """
+        Places the current player's piece on cell, returning True if
+        that completes a line of k.
+        """
+        piece = self.turn
+        self.cells[cell] = piece
+        self.bits[piece] |= 1 << cell
+        self.empty -= 1
+        self.turn = 3 - piece
+        counts, k = self.counts[piece], self.game.k
+        won = False
+        for line in self.game.cell_lines[cell]:
+            counts[line] += 1
+            if counts[line] == k:
+                won = True
+        return won
+
+    def unmake(self, cell):
+        piece = self.cells[cell]
+        self.cells[cell] = 0
+        self.bits[piece] ^= 1 << cell
+        self.empty += 1
+        self.turn = piece
+        counts = self.counts[piece]
+        for line in self.game.cell_lines[cell]:
+            counts[line] -= 1
+
+    def evaluate(self):
+        """
+        Returns the heuristic value of the position for the player to
+        move: the weighted lines still open to them less their opponent's.
+        """
+        weights = self.game.weights
+        own, other = self.counts[self.turn], self.counts[3 - self.turn]
+        score = 0
+        for line in range(len(own)):
+            if not other[line]:
+                score += weights[own[line]]
+            elif not own[line]:
+                score -= weights[other[line]]
+        return score
+
+    def ordered(self, ply, best):
+        """
+        Returns the empty cells, trying the table's best move first,
+        then this ply's killer moves, then by history score.
+        """
+        cells = self.cells
+        moves = [cell for cell in self.game.central if cells[cell] == 0]
+        history = self.history
+        moves.sort(key=lambda cell: -history[cell])
+        first = [best] if best is not None else []
+        first.extend(killer for killer in self.killers.get(ply, [])
+                     if killer != best and cells[killer] == 0)
+        if first:
+            moves = first + [cell for cell in moves if cell not in first]
+        return moves
+
+    def negamax(self, depth, ply, alpha, beta):
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.node(ply)
+        if self.nodes % CHECK_INTERVAL == 0:
+            if time.perf_counter() > self.deadline:
+                raise Timeout
+            if self.stop is not None and self.stop.is_set():
+                raise Timeout
+        if self.empty == 0:
+            return 0, None
+        if depth == 0:
+            return self.evaluate(), None
+
+        key = (self.bits[1], self.bits[2])
+        entry = self.game.transpositions.get(key)
+        best_move = None
+        if entry is not None:
+            if self.stats is not None:
+                self.stats.table_hit(ply)
+            entry_depth, value, flag, best_move = entry
+            value = self.from_table(value, ply)
+            if entry_depth >= depth:
+                if flag == 0:
+                    return value, best_move
+                elif flag == 1:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, best_move
+
+        original_alpha = alpha
+        best = -WIN - 1
+        for cell in self.ordered(ply, best_move):
+            if self.make(cell):
+                value = WIN - ply - 1
+            else:
+                value = -self.negamax(depth - 1, ply + 1, -beta, -alpha)[0]
+            self.unmake(cell)
+            if value > best:
+                best, best_move = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                if self.stats is not None:
+                    self.stats.cutoff(ply)
+                killers = self.killers.setdefault(ply, [])
+                if cell not in killers:
+                    killers.insert(0, cell)
+                    del killers[2:]
+                self.history[cell] += depth * depth
+                break
+
+        # Store exact values, or lower and upper bounds after cutoffs
+        if best <= original_alpha:
+            flag = 2
+        elif best >= beta:
+            flag = 1
+        else:
+            flag = 0
+        self.game.transpositions[key] = (
+            depth, self.from_table(best, -ply), flag, best_move
+        )
+        return best, best_move
+
+    def from_table(self, value, ply):
+        """
+        Converts the score of a win or loss between plies from the root
+        (in search) and plies from the position (in the table), given
+        the ply of the position, or minus it for the other direction.
+        """
+        if value > WIN - self.game.size - 1:
+            return value - ply
+        elif value < -WIN + self.game.size + 1:
+            return value + ply
+        return value
+
+    def run(self):
+        """
+        Searches to depth 1, 2, ... until the time budget runs out, the
+        game tree is exhausted or a forced result is found, returning
+        the best move of the deepest completed search.
+        """
+        cells = self.cells
+        move = next(cell for cell in self.game.central if cells[cell] == 0)
+        begin = start = time.perf_counter()
+        for depth in range(1, self.empty + 1):
+            try:
+                value, best = self.negamax(depth, 0, -WIN - 1, WIN + 1)
+            except Timeout:
+                break
+            self.depth = depth
+            if self.stats is not None:
+                now = time.perf_counter()
+                self.stats.depth_times.append(now - start)
+                start = now
+            if best is not None:
+                move = best
+            if abs(value) >= WIN - self.game.size:
+                break
+        if self.stats is not None:
+            self.stats.time += time.perf_counter() - begin
+        return move
+
+
+def main():
+    if len(sys.argv) not in [1, 4, 5]:
+        sys.exit("Usage: python mnk.py [m n k [seconds]]")
+    m, n, k = map(int, sys.argv[1:4]) if len(sys.argv) > 1 else (4, 4, 3)
+    time_limit = float(sys.argv[4]) if len(sys.argv) > 4 else TIME_LIMIT
+
+    game = Game(m, n, k)
+    board = game.initial_state()
+    while not game.terminal(board):
+        start = time.perf_counter()
+        search = Search(game, board, time_limit)
+        cell = search.run()
+        elapsed = time.perf_counter() - start
+        move = divmod(cell, n)
+        print(f"{game.player(board)} plays {move}: depth {search.depth}, "
+              f"{search.nodes} nodes in {elapsed * 1000:.0f} ms")
+        board = game.result(board, move)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    winner = game.winner(board)
+    print(f"Game Over: {winner} wins." if winner else "Game Over: Tie.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mnk
+
+# State of a pool worker: the game, the board searched, the best value
+# found so far at the root, shared by every worker, and the time by
+# which searches must end
+worker_game = None
+worker_board = None
+worker_alpha = None
+worker_deadline = None
+
+
+def init_worker(game, board, alpha, deadline):
+    global worker_game, worker_board, worker_alpha, worker_deadline
+    worker_game = game
+    worker_board = board
+    worker_alpha = alpha
+    worker_deadline = deadline
+
+
+def search_move(task):
+    """
+    Returns (cell, value, exact, nodes) for the root move task (cell,
+    depth), searched with the best root value found so far as its alpha
+    bound. The value is exact if it beats that bound, or else only an
+    upper bound on the move's value, which may equal the root's best.
+    """
+    cell, depth = task
+    search = mnk.Search(worker_game, worker_board,
+                        worker_deadline - time.perf_counter())
+    if search.make(cell):
+        return cell, mnk.WIN - 1, True, 1
+    alpha = worker_alpha.value
+    value = -search.negamax(depth - 1, 1, -mnk.WIN - 1, -alpha)[0]
+    exact = value > alpha
+    if exact:
+        with worker_alpha.get_lock():
+            if value > worker_alpha.value:
+                worker_alpha.value = value
+    return cell, value, exact, search.nodes
+
+
+def serial_search(game, board, depth):
+    """
+    Returns (value, cell, nodes) of a depth-limited alpha-beta search
+    of board for the player to move.
+    """
+    search = mnk.Search(game, board, math.inf)
+    value, cell = search.negamax(depth, 0, -mnk.WIN - 1, mnk.WIN + 1)
+    return value, cell, search.nodes
+
+
+def parallel_search(game, board, depth, workers, time_limit=math.inf,
+                    stop=None):
+    """
+    Returns (value, cell, nodes) of a depth-limited alpha-beta search
+    of board, with the root moves split across a pool of processes.
+    Raises mnk.Timeout if the search takes over time_limit seconds, or
+    if the threading.Event stop is set during the first root move.
+
+    Like young brothers wait, the first root move in move order is
+    searched here with a full window, so that the other root moves start
+    from its value as their alpha bound. Those are then searched in
+    parallel, and every improvement to the root's best value is shared
+    with the moves searched after it. Only exact values are taken as the
+    best, so the root value is the same as that of serial_search, and
+    the cell chosen has that value.
+    """
+    deadline = time.perf_counter() + time_limit
+    search = mnk.Search(game, board, time_limit, stop)
+    entry = game.transpositions.get((search.bits[1], search.bits[2]))
+    moves = search.ordered(0, entry[3] if entry else None)
+
+    # Search the eldest brother first
+    first = moves[0]
+    if search.make(first):
+        return mnk.WIN - 1, first, 1
+    value = -search.negamax(depth - 1, 1, -mnk.WIN - 1, mnk.WIN + 1)[0]
+    search.unmake(first)
+    best, best_cell, nodes = value, first, search.nodes
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    alpha = context.Value("q", best)
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context,
+        initializer=init_worker, initargs=(game, board, alpha, deadline)
+    ) as executor:
+        tasks = [(cell, depth) for cell in moves[1:]]
+        for cell, value, exact, searched in executor.map(search_move,
+                                                         tasks):
+            nodes += searched
+            if exact and value > best:
+                best, best_cell = value, cell
+    return best, best_cell, nodes
+
+
+def minimax(game, board, workers, time_limit=mnk.TIME_LIMIT, stop=None):
+    """
+    Returns the best action found for the current player on the board
+    within time_limit seconds, like game.minimax, searching one ply
+    deeper at a time with parallel_search.
+
+    Setting the optional threading.Event stop ends the search early,
+    though only between depths and during the first root move of each.
+    """
+    if game.terminal(board):
+        return None
+    deadline = time.perf_counter() + time_limit
+    cells = [cell for row in board for cell in row]
+    move = next(cell for cell in game.central if cells[cell] == mnk.EMPTY)
+    for depth in range(1, cells.count(mnk.EMPTY) + 1):
+        if stop is not None and stop.is_set():
+            break
+        try:
+            value, move, _ = parallel_search(
+                game, board, depth, workers,
+                deadline - time.perf_counter(), stop
+            )
+        except mnk.Timeout:
+            break
+        if abs(value) >= mnk.WIN - game.size:
+            break
+    return divmod(move, game.n)
+
+
+def move_value(game, board, cell, depth):
+    """
+    Returns the value for the player to move of playing cell on board,
+    by a full-window search to depth from an empty transposition table.
+    """
+    game.transpositions.clear()
+    search = mnk.Search(game, board, math.inf)
+    if search.make(cell):
+        return mnk.WIN - 1
+    return -search.negamax(depth - 1, 1, -mnk.WIN - 1, mnk.WIN + 1)[0]
+
+
+def speedup_report(m, n, k, depth, moves=2):
+    """
+    Prints the time of a depth-limited search of a position after moves
+    opening moves, serially and in parallel with 1, 2, 4, ... workers up
+    to the number of CPUs, checking that every search finds the same
+    root value, and a cell of that value. Each search starts from an
+    empty transposition table.
+    """
+    game = mnk.Game(m, n, k)
+    board = game.initial_state()
+    for _ in range(moves):
+        board = game.result(board, game.minimax(board, 0.05))
+        game.transpositions.clear()
+
+    print(f"{m},{n},{k} board after {moves} moves, depth {depth}")
+    start = time.perf_counter()
+    value, _, nodes = serial_search(game, board, depth)
+    serial = time.perf_counter() - start
+    print(f"{'serial':>16}: {serial:8.2f} s, {nodes} nodes, value {value}")
+
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    if counts[-1] != (os.cpu_count() or 1):
+        counts.append(os.cpu_count() or 1)
+    for workers in counts:
+        game.transpositions.clear()
+        start = time.perf_counter()
+        parallel_value, cell, nodes = parallel_search(game, board, depth,
+                                                      workers)
+        elapsed = time.perf_counter() - start
+        print(f"{f'{workers} workers':>16}: {elapsed:8.2f} s, {nodes} nodes, "
+              f"value {parallel_value}, speedup {serial / elapsed:.2f}x")
+        if parallel_value != value:
+            sys.exit("Parallel search found a different root value.")
+        if move_value(game, board, cell, depth) != value:
+            sys.exit(f"Parallel search chose cell {cell}, which is worse.")
+
+
+def main():
+    if len(sys.argv) not in [1, 5]:
+        sys.exit("Usage: python parallel.py [m n k depth]")
+    m, n, k, depth = (map(int, sys.argv[1:]) if len(sys.argv) == 5
+                      else (6, 6, 4, 6))
+    speedup_report(m, n, k, depth)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,49 @@
 import pygame
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+import mnk
+import parallel
 import tictactoe as ttt
 
+USAGE = ("Usage: python runner.py [m n k] [--play X|O] [--frames N] "
+         "[--workers N]")
+
+# Seconds the computer appears to think for, at least
+AI_DELAY = 0.5
+
+# Frames per second the window is drawn at, at most
+FPS = 60
+
+# Parse options: --play picks a side for the user, skipping the menu,
+# and --frames quits after that many frames, printing frame statistics
+# (with SDL_VIDEODRIVER=dummy, this runs headless), and --workers
+# splits the m,n,k search across that many processes
+args = sys.argv[1:]
+user = None
+max_frames = None
+workers = 1
+while len(args) >= 2 and args[-2].startswith("--"):
+    option, value = args[-2:]
+    if option == "--play" and value in [ttt.X, ttt.O]:
+        user = value
+    elif option == "--frames" and value.isdigit():
+        max_frames = int(value)
+    elif option == "--workers" and value.isdigit() and int(value) > 0:
+        workers = int(value)
+    else:
+        sys.exit(USAGE)
+    args = args[:-2]
+
+# Play an m,n,k game instead, with python runner.py m n k
+if len(args) == 3:
+    ttt = mnk.Game(*map(int, args))
+elif args:
+    sys.exit(USAGE)
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,17 +55,76 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
-user = None
 board = ttt.initial_state()
-ai_turn = False
+rows, columns = len(board), len(board[0])
+
+# Fit the board between the title and the button below it
+tile_size = min(80, (height - 160) // rows, (width - 40) // columns)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 14)
+
+# The AI searches on a worker thread, so that the window keeps drawing.
+# While it thinks, ai_move is the future of its move, and setting
+# ai_stop cancels the search if the engine supports it.
+executor = ThreadPoolExecutor(max_workers=1)
+ai_move = None
+ai_stop = None
+ai_start = None
+
+# Frame durations, for the frame rate shown and reported
+clock = pygame.time.Clock()
+frame_times = deque(maxlen=FPS)
+frames = 0
+slowest_frame = 0
+slowest_thinking_frame = 0
+
+
+def think(board, stop):
+    """
+    Returns the AI's move on board, searching until stop is set if the
+    engine can be cancelled.
+    """
+    if isinstance(ttt, mnk.Game) and workers > 1:
+        return parallel.minimax(ttt, board, workers, stop=stop)
+    if isinstance(ttt, mnk.Game):
+        return ttt.minimax(board, stop=stop)
+    return ttt.minimax(board)
+
+
+def cancel_ai():
+    """
+    Abandons the AI's search in progress, if any.
+    """
+    global ai_move, ai_stop
+    if ai_move is not None:
+        ai_stop.set()
+        ai_move.cancel()
+    ai_move = ai_stop = None
+
+
+def finish():
+    cancel_ai()
+    executor.shutdown(wait=False)
+    if max_frames is not None:
+        fps = len(frame_times) * 1000 / max(sum(frame_times), 1)
+        print(f"{frames} frames, {fps:.1f} fps over the last "
+              f"{len(frame_times)}, slowest frame {slowest_frame} ms, "
+              f"slowest while thinking {slowest_thinking_frame} ms")
+    sys.exit()
+
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
-            sys.exit()
+            finish()
+
+        # Escape returns to the menu, abandoning the game
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            user = None
+            board = ttt.initial_state()
+            cancel_ai()
 
     screen.fill(black)
 
@@ -67,13 +166,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (columns / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(columns):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -108,23 +206,25 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI's search, and play its move once it is found
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_stop = threading.Event()
+                ai_move = executor.submit(think, board, ai_stop)
+                ai_start = time.perf_counter()
+            elif (ai_move.done()
+                    and time.perf_counter() - ai_start >= AI_DELAY):
+                board = ttt.result(board, ai_move.result())
+                ai_move = ai_stop = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
+            for i in range(rows):
+                for j in range(columns):
+                    if (board[i][j] == ttt.EMPTY
+                            and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
         if game_over:
@@ -141,6 +241,22 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    cancel_ai()
+
+    # Show the frame rate
+    if frame_times:
+        fps = len(frame_times) * 1000 / max(sum(frame_times), 1)
+        rate = smallFont.render(f"{fps:.0f} fps", True, white)
+        screen.blit(rate, (5, height - 20))
 
     pygame.display.flip()
+
+    frame_time = clock.tick(FPS)
+    frames += 1
+    if frames > 1:
+        frame_times.append(frame_time)
+        slowest_frame = max(slowest_frame, frame_time)
+        if ai_move is not None:
+            slowest_thinking_frame = max(slowest_thinking_frame, frame_time)
+    if max_frames is not None and frames >= max_frames:
+        finish()
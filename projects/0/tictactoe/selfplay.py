@@ -0,0 +1,217 @@
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import mnk
+import tictactoe as ttt
+from stats import Stats
+
+USAGE = ("Usage: python selfplay.py [--engine tictactoe | bitboard | m,n,k] "
+         "[--games N] [--workers N] [--time SECONDS] [--json FILE]")
+
+# Seconds per move of the m,n,k engine, unless given with --time
+TIME_LIMIT = 0.1
+
+# Engines loaded in this process, kept so that their tables persist
+# across the games a worker plays
+engines = {}
+
+
+def engine_for(name):
+    """
+    Returns the engine named "tictactoe", "bitboard" or "m,n,k".
+    """
+    if name not in engines:
+        if name == "tictactoe":
+            engines[name] = ttt
+        elif name == "bitboard":
+            engines[name] = bitboard
+        else:
+            try:
+                m, n, k = map(int, name.split(","))
+            except ValueError:
+                raise ValueError(f"unknown engine {name}")
+            engines[name] = mnk.Game(m, n, k)
+    return engines[name]
+
+
+def ai_move(engine, board, time_limit):
+    """
+    Returns (move, nodes) for the AI's move on board, where nodes is the
+    number of positions its search visited, table hits included.
+    """
+    if isinstance(engine, mnk.Game):
+        search = mnk.Search(engine, board, time_limit)
+        return divmod(search.run(), engine.n), search.nodes
+    stats = Stats()
+    move = engine.minimax(board, stats)
+    return move, sum(stats.nodes)
+
+
+def play_game(task):
+    """
+    Plays one game of task (engine name, random player or None for AI
+    against AI, seed, time limit), returning a dict of its winner and
+    the latency and nodes of each AI move.
+    """
+    name, random_player, seed, time_limit = task
+    engine = engine_for(name)
+    rng = random.Random(seed)
+    board = engine.initial_state()
+    latencies = []
+    nodes = 0
+    while not engine.terminal(board):
+        if engine.player(board) == random_player:
+            move = rng.choice(sorted(engine.actions(board)))
+        else:
+            start = time.perf_counter()
+            move, searched = ai_move(engine, board, time_limit)
+            latencies.append(time.perf_counter() - start)
+            nodes += searched
+        board = engine.result(board, move)
+    return {
+        "random_player": random_player,
+        "winner": engine.winner(board),
+        "latencies": latencies,
+        "nodes": nodes,
+    }
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(games):
+    """
+    Returns the outcome counts and move statistics of a list of games.
+    """
+    latencies = sorted(latency for game in games
+                       for latency in game["latencies"])
+    nodes = sum(game["nodes"] for game in games)
+    thinking = sum(latencies)
+
+    # The AI loses when the random player wins, and one of the AIs loses
+    # every game of AI against AI that is not a draw
+    losses = sum(1 for game in games if game["winner"] is not None
+                 and game["random_player"] in [None, game["winner"]])
+    return {
+        "games": len(games),
+        "x_wins": sum(1 for game in games if game["winner"] == ttt.X),
+        "o_wins": sum(1 for game in games if game["winner"] == ttt.O),
+        "draws": sum(1 for game in games if game["winner"] is None),
+        "ai_losses": losses,
+        "moves": len(latencies),
+        "mean_move_ms": 1000 * thinking / max(len(latencies), 1),
+        "p99_move_ms": (1000 * percentile(latencies, 0.99)
+                        if latencies else 0),
+        "nodes": nodes,
+        "nodes_per_second": nodes / thinking if thinking else 0,
+    }
+
+
+def self_play(name, games, workers=1, time_limit=TIME_LIMIT, seed=0):
+    """
+    Plays games of AI against AI and games of random moves against AI,
+    the random player alternating between X and O, across a pool of
+    worker processes. Returns a dict of results for each kind of game.
+    """
+    engine_for(name)
+    tasks = {
+        "ai_vs_ai": [(name, None, seed + i, time_limit)
+                     for i in range(games)],
+        "random_vs_ai": [(name, [ttt.X, ttt.O][i % 2], seed + i, time_limit)
+                         for i in range(games)],
+    }
+    results = {}
+    if workers <= 1:
+        for kind, kind_tasks in tasks.items():
+            results[kind] = summarize([play_game(task)
+                                       for task in kind_tasks])
+        return results
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=context) as executor:
+        for kind, kind_tasks in tasks.items():
+            chunksize = max(1, len(kind_tasks) // (workers * 4))
+            results[kind] = summarize(list(
+                executor.map(play_game, kind_tasks, chunksize=chunksize)
+            ))
+    return results
+
+
+def main():
+    args = sys.argv[1:]
+    name = "tictactoe"
+    games = 100
+    workers = os.cpu_count() or 1
+    time_limit = TIME_LIMIT
+    output = None
+    while args:
+        arg = args.pop(0)
+        if not args:
+            sys.exit(USAGE)
+        value = args.pop(0)
+        if arg == "--engine":
+            name = value
+        elif arg == "--games":
+            games = int(value)
+        elif arg == "--workers":
+            workers = int(value)
+        elif arg == "--time":
+            time_limit = float(value)
+        elif arg == "--json":
+            output = value
+        else:
+            sys.exit(USAGE)
+
+    start = time.perf_counter()
+    results = self_play(name, games, workers, time_limit)
+    elapsed = time.perf_counter() - start
+
+    print(f"{name} engine, {games} games of each kind, {workers} workers, "
+          f"{elapsed:.2f} s")
+    for kind, result in results.items():
+        print(f"{kind:>16}: X {result['x_wins']}, O {result['o_wins']}, "
+              f"draws {result['draws']}, AI losses {result['ai_losses']}")
+        print(f"{'':>16}  {result['moves']} moves, "
+              f"mean {result['mean_move_ms']:.3f} ms, "
+              f"p99 {result['p99_move_ms']:.3f} ms, "
+              f"{result['nodes_per_second']:.0f} nodes/s")
+
+    if output is not None:
+        report = {
+            "engine": name,
+            "games": games,
+            "workers": workers,
+            "time_limit": time_limit,
+            "elapsed": elapsed,
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    # Perfect play always draws tictactoe, but an m,n,k game may be a
+    # forced win for one player, so only its AI's losses to random
+    # moves count there
+    checked = list(results)
+    if isinstance(engine_for(name), mnk.Game):
+        checked.remove("ai_vs_ai")
+    if any(results[kind]["ai_losses"] for kind in checked):
+        sys.exit("The AI lost a game.")
+
+
+if __name__ == "__main__":
+    main()
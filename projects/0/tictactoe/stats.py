@@ -0,0 +1,68 @@
+class Stats():
+    """
+    Optional collector of search statistics, passed to minimax and
+    filled in as it searches.
+
+    Counts are lists indexed by ply from the root. Iterative deepening
+    searches also record the seconds taken by each completed depth.
+
+    What counts as a cutoff depends on the engine. mnk.py counts
+    alpha-beta cutoffs, where a move reached beta. tictactoe.py and
+    bitboard.py search without a window, to store exact values in their
+    tables, so they only count win cutoffs, where a winning move ends
+    the search of its siblings; these are far fewer than alpha-beta
+    cutoffs would be. Only mnk.py deepens iteratively, so depth_times
+    stays empty for the 3x3 engines, which search to the end at once.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.cutoffs = []
+        self.table_hits = []
+        self.depth_times = []
+        self.book_hits = 0
+        self.time = 0
+
+    @staticmethod
+    def count(counts, ply):
+        while len(counts) <= ply:
+            counts.append(0)
+        counts[ply] += 1
+
+    def node(self, ply):
+        self.count(self.nodes, ply)
+
+    def cutoff(self, ply):
+        self.count(self.cutoffs, ply)
+
+    def table_hit(self, ply):
+        self.count(self.table_hits, ply)
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dict of plain values, with totals.
+        """
+        return {
+            "nodes": sum(self.nodes),
+            "cutoffs": sum(self.cutoffs),
+            "table_hits": sum(self.table_hits),
+            "book_hits": self.book_hits,
+            "time": self.time,
+            "nodes_by_ply": list(self.nodes),
+            "cutoffs_by_ply": list(self.cutoffs),
+            "table_hits_by_ply": list(self.table_hits),
+            "depth_times": list(self.depth_times),
+        }
+
+    def __str__(self):
+        lines = [f"{sum(self.nodes)} nodes, {sum(self.cutoffs)} cutoffs, "
+                 f"{sum(self.table_hits)} table hits, "
+                 f"{self.book_hits} book hits in {self.time * 1000:.2f} ms"]
+        for ply in range(len(self.nodes)):
+            cutoffs = self.cutoffs[ply] if ply < len(self.cutoffs) else 0
+            hits = self.table_hits[ply] if ply < len(self.table_hits) else 0
+            lines.append(f"    ply {ply}: {self.nodes[ply]} nodes, "
+                         f"{cutoffs} cutoffs, {hits} table hits")
+        for depth, seconds in enumerate(self.depth_times, 1):
+            lines.append(f"    depth {depth}: {seconds * 1000:.2f} ms")
+        return "\n".join(lines)
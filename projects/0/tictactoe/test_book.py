@@ -0,0 +1,65 @@
+import functools
+
+import book
+import bookfile
+import tictactoe as ttt
+
+
+@functools.lru_cache(maxsize=None)
+def reference(cells):
+    """
+    Returns the minimax value of the cell digits of a board by plain
+    search of every move, independent of the engine's symmetries.
+    """
+    for a, b, c in ttt.LINES:
+        if cells[a] != 0 and cells[a] == cells[b] == cells[c]:
+            return 1 if cells[a] == 1 else -1
+    if 0 not in cells:
+        return 0
+    turn = 1 if cells.count(1) == cells.count(2) else 2
+    values = [reference(cells[:k] + (turn,) + cells[k + 1:])
+              for k in range(9) if cells[k] == 0]
+    return max(values) if turn == 1 else min(values)
+
+
+def board_of(cells):
+    """Returns the board of a tuple of cell digits."""
+    return [[ttt.EMPTY if digit == 0 else ttt.X if digit == 1 else ttt.O
+             for digit in cells[i:i + 3]] for i in range(0, 9, 3)]
+
+
+def test_every_book_move_is_optimal():
+    entries = book.build()
+    count = 0
+    for cells in book.positions():
+        key, symmetry = ttt.orient(cells)
+        move, value = entries[key]
+        cell = ttt.SYMMETRIES[symmetry][move]
+        turn = 1 if cells.count(1) == cells.count(2) else 2
+        assert cells[cell] == 0
+        assert value == reference(cells)
+        assert reference(cells[:cell] + (turn,) + cells[cell + 1:]) == value
+        count += 1
+    assert count == len(entries)
+
+
+def test_minimax_plays_book_moves(monkeypatch):
+    monkeypatch.setattr(ttt, "opening_book", book.build())
+    for cells in book.positions():
+        i, j = ttt.minimax(board_of(cells))
+        cell = 3 * i + j
+        turn = 1 if cells.count(1) == cells.count(2) else 2
+        assert cells[cell] == 0
+        assert (reference(cells[:cell] + (turn,) + cells[cell + 1:])
+                == reference(cells))
+
+
+def test_book_survives_save_and_load(tmp_path):
+    entries = book.build()
+    path = str(tmp_path / "tictactoe.book")
+    bookfile.save(entries, path)
+    assert bookfile.load(path) == entries
+    with open(path, "r+b") as f:
+        f.truncate(bookfile.HEADER.size + 1)
+    assert bookfile.load(path) == {}
+    assert bookfile.load(str(tmp_path / "missing.book")) == {}
@@ -0,0 +1,72 @@
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import mnk
+import tictactoe as ttt
+from test_tictactoe import reachable
+
+
+def test_3_3_3_rules_agree_with_tictactoe():
+    game = mnk.Game()
+    for board in reachable():
+        for name in ["player", "actions", "winner", "terminal", "utility"]:
+            assert (getattr(game, name)(board)
+                    == getattr(ttt, name)(board)), (name, board)
+        for action in ttt.actions(board):
+            assert game.result(board, action) == ttt.result(board, action)
+
+
+def test_3_3_3_moves_are_optimal():
+    game = mnk.Game()
+    boards = [board for board in reachable() if not ttt.terminal(board)]
+    for board in random.Random(0).sample(boards, 150):
+        game.transpositions.clear()
+        cells = tuple(ttt.DIGITS[cell] for row in board for cell in row)
+        played = ttt.result(board, game.minimax(board, time_limit=10))
+        assert ttt.value(tuple(ttt.DIGITS[cell] for row in played
+                               for cell in row)) == ttt.value(cells)
+
+
+def test_larger_games():
+    game = mnk.Game(5, 5, 4)
+    board = game.initial_state()
+    for move in [(2, 1), (0, 0), (2, 2), (0, 4), (2, 3), (4, 4)]:
+        board = game.result(board, move)
+
+    # X must complete or block a line of four in the middle row
+    assert game.minimax(board, time_limit=5) in [(2, 0), (2, 4)]
+    board = game.result(board, (2, 0))
+    assert game.winner(board) == mnk.X and game.terminal(board)
+
+    with pytest.raises(ValueError):
+        mnk.Game(3, 3, 4)
+    with pytest.raises(ValueError):
+        game.result(board, (2, 0))
+
+
+def test_stopped_search_still_moves():
+    game = mnk.Game(7, 7, 5)
+    board = game.initial_state()
+    stop = threading.Event()
+    stop.set()
+    assert game.minimax(board, stop=stop) in game.actions(board)
+
+
+@pytest.mark.parametrize("args", [["--play", "X"], ["4", "4", "3",
+                                                    "--play", "O"]])
+def test_runner_headless(args):
+    pytest.importorskip("pygame")
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    result = subprocess.run(
+        [sys.executable, "runner.py", *args, "--frames", "90"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert re.search(r"^90 frames, [\d.]+ fps", result.stdout, re.M)
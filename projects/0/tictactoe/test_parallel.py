@@ -0,0 +1,66 @@
+import math
+import multiprocessing
+import random
+
+import mnk
+import parallel
+
+
+def positions(m, n, k, count, seed=0):
+    """
+    Yields (game, board, depth) for count random positions that are not
+    over, each a few random moves into an m,n,k game.
+    """
+    rng = random.Random(seed)
+    while count:
+        game = mnk.Game(m, n, k)
+        board = game.initial_state()
+        for _ in range(rng.randrange(6)):
+            board = game.result(board, rng.choice(sorted(game.actions(board))))
+            if game.terminal(board):
+                break
+        if not game.terminal(board):
+            count -= 1
+            yield game, board, rng.randrange(2, 5)
+
+
+def test_fail_low_moves_are_not_exact():
+
+    # Every move searched as if a later sibling had already raised the
+    # root's alpha to the best value
+    for game, board, depth in positions(4, 4, 3, 10):
+        game.transpositions.clear()
+        value, _, _ = parallel.serial_search(game, board, depth)
+        alpha = multiprocessing.Value("q", value)
+        for i, j in sorted(game.actions(board)):
+            cell = i * game.n + j
+            game.transpositions.clear()
+            alpha.value = value
+            parallel.init_worker(game, board, alpha, math.inf)
+            _, bound, exact, _ = parallel.search_move((cell, depth))
+            real = parallel.move_value(game, board, cell, depth)
+            if exact:
+                assert bound == real
+            else:
+                assert real <= bound <= value
+
+
+def test_parallel_search_matches_serial():
+    for game, board, depth in positions(4, 4, 3, 8, seed=1):
+        game.transpositions.clear()
+        value, _, _ = parallel.serial_search(game, board, depth)
+        game.transpositions.clear()
+        found, cell, _ = parallel.parallel_search(game, board, depth, 2)
+        assert found == value
+        assert parallel.move_value(game, board, cell, depth) == value
+
+
+def test_minimax_takes_a_win():
+    game = mnk.Game(4, 4, 3)
+    board = game.initial_state()
+    for move in [(0, 0), (3, 3), (0, 1), (3, 0)]:
+        board = game.result(board, move)
+    assert parallel.minimax(game, board, 2, time_limit=5) == (0, 2)
+    board = game.initial_state()
+    assert parallel.minimax(game, board, 2,
+                            time_limit=0.2) in game.actions(board)
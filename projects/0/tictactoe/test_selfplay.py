@@ -0,0 +1,25 @@
+import selfplay
+import tictactoe as ttt
+
+
+def test_perfect_engines_never_lose():
+    for name in ["tictactoe", "bitboard"]:
+        results = selfplay.self_play(name, 20)
+        for kind, result in results.items():
+            assert result["games"] == 20
+            assert result["ai_losses"] == 0, (name, kind)
+        assert results["ai_vs_ai"]["draws"] == 20
+
+
+def test_decisive_games_count_as_losses():
+    games = [
+        {"random_player": None, "winner": ttt.X, "latencies": [0.1],
+         "nodes": 1},
+        {"random_player": None, "winner": None, "latencies": [0.1],
+         "nodes": 1},
+        {"random_player": ttt.O, "winner": ttt.O, "latencies": [0.1],
+         "nodes": 1},
+        {"random_player": ttt.O, "winner": ttt.X, "latencies": [0.1],
+         "nodes": 1},
+    ]
+    assert selfplay.summarize(games)["ai_losses"] == 2
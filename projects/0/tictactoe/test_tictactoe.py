@@ -0,0 +1,39 @@
+import bitboard
+import tictactoe as ttt
+
+
+def reachable():
+    """
+    Returns every board reachable from the empty board, terminal or not.
+    """
+    boards = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = tuple(ttt.flatten(board))
+        if key in boards:
+            continue
+        boards[key] = board
+        if not ttt.terminal(board):
+            stack.extend(ttt.result(board, action)
+                         for action in ttt.actions(board))
+    return list(boards.values())
+
+
+def test_rules_agree_with_bitboard():
+    boards = reachable()
+    assert len(boards) == 5478
+    for board in boards:
+        for name in ["player", "actions", "winner", "terminal", "utility"]:
+            assert (getattr(ttt, name)(board)
+                    == getattr(bitboard, name)(board)), (name, board)
+        for action in ttt.actions(board):
+            assert ttt.result(board, action) == bitboard.result(board,
+                                                                action)
+
+
+def test_shared_symmetries():
+    assert bitboard.TRANSFORMS is ttt.TRANSFORMS
+    for transform, table in zip(ttt.SYMMETRIES, bitboard.SYMMETRIES):
+        for cell in range(9):
+            assert table[1 << cell] == 1 << transform[cell]
@@ -2,13 +2,50 @@
 Tic Tac Toe Player
 """
 
-import math
-import copy
+import time
+
+import bookfile
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Cells of a board encoded as base-3 digits, row by row
+DIGITS = {EMPTY: 0, X: 1, O: 2}
+
+# Cell indices of each row, column and diagonal
+LINES = [
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6)
+]
+
+# For each rotation and reflection of the board, the source cell of
+# every cell of the transformed board
+TRANSFORMS = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (2 - j, 2 - i),
+]
+SYMMETRIES = [
+    [3 * transform(i, j)[0] + transform(i, j)[1]
+     for i in range(3) for j in range(3)]
+    for transform in TRANSFORMS
+]
+
+# Maps canonical board keys to their minimax value, kept for the whole
+# process so that positions are solved once across moves and games
+transpositions = {}
+
+# Maps canonical board keys to (canonical move cell, value), loaded from
+# the opening book file once, or empty if it has not been built
+opening_book = bookfile.load()
+
 
 def initial_state():
     """
@@ -19,13 +56,20 @@ def initial_state():
             [EMPTY, EMPTY, EMPTY]]
 
 
+def flatten(board):
+    """
+    Returns the cells of a board in one list, row by row.
+    """
+    return board[0] + board[1] + board[2]
+
+
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    flatten_board = sum(board, [])
+    cells = flatten(board)
 
-    if flatten_board.count(X) > flatten_board.count(O):
+    if cells.count(X) > cells.count(O):
         return O
     else:
         return X
@@ -49,60 +93,41 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    board_copy = copy.deepcopy(board)
-    allowed = actions(board)
-
-    if not action or (action not in allowed):
+    if not action or action not in actions(board):
         raise ValueError
 
-    if board[action[0]][action[1]] == EMPTY:
-        board_copy[action[0]][action[1]] = player(board)
-        return board_copy
+    board_copy = [list(row) for row in board]
+    board_copy[action[0]][action[1]] = player(board)
+    return board_copy
+
+
+def line_winner(cells):
+    """
+    Returns the player owning a whole line of a flattened board, if any,
+    and X if both do.
+    """
+    found = None
+    for a, b, c in LINES:
+        if cells[a] is not EMPTY and cells[a] == cells[b] == cells[c]:
+            if cells[a] == X:
+                return X
+            found = O
+    return found
 
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    def won(p):
-        win = False
-        if board[0][0] == p and board[0][1] == p and board[0][2] == p:
-            win = True
-        elif board[1][0] == p and board[1][1] == p and board[1][2] == p:
-            win = True
-        elif board[2][0] == p and board[2][1] == p and board[2][2] == p:
-            win = True
-        elif board[0][0] == p and board[1][0] == p and board[2][0] == p:
-            win = True
-        elif board[0][1] == p and board[1][1] == p and board[2][1] == p:
-            win = True
-        elif board[0][2] == p and board[1][2] == p and board[2][2] == p:
-            win = True
-        elif board[0][0] == p and board[1][1] == p and board[2][2] == p:
-            win = True
-        elif board[0][2] == p and board[1][1] == p and board[2][0] == p:
-            win = True
-
-        return win
-
-    if won(X):
-        return X
-    elif won(O):
-        return O
-    else:
-        return None
+    return line_winner(flatten(board))
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    flatten_board = sum(board, [])
-
-    if winner(board) or flatten_board.count(EMPTY) == 0:
-        return True
-    else:
-        return False
+    cells = flatten(board)
+    return line_winner(cells) is not None or EMPTY not in cells
 
 
 def utility(board):
@@ -117,58 +142,112 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def orient(cells):
     """
-    Returns the optimal action for the current player on the board.
+    Returns (key, symmetry) for a tuple of cell digits, where key is the
+    same for the board and all of its rotations and reflections (the
+    smallest base-3 number among them), and cell k of that canonical
+    board is cell SYMMETRIES[symmetry][k] of this one.
     """
-    if terminal(board):
-        return None
-
-    current_player = player(board)
-
-    def max_value(current_board, alpha, beta):
-        v = -math.inf
-        move = ()
-
-        if terminal(current_board):
-            alpha = utility(current_board)
-            return [alpha, move]
+    best = None
+    for i, symmetry in enumerate(SYMMETRIES):
+        key = 0
+        for cell in symmetry:
+            key = 3 * key + cells[cell]
+        if best is None or key < best[0]:
+            best = (key, i)
+    return best
 
-        for action in actions(current_board):
-            minV = min_value(result(current_board, action), alpha, beta)[0]
 
-            if minV > v:
-                v = minV
-                alpha = max(alpha, v)
-                move = action
-
-            if beta <= alpha:
-                break
-
-        return [v, move]
-
-    def min_value(current_board, alpha, beta):
-        v = math.inf
-        move = ()
+def canonical(cells):
+    """
+    Returns the same key for a tuple of cell digits and all of its
+    rotations and reflections.
+    """
+    return orient(cells)[0]
 
-        if terminal(current_board):
-            beta = utility(current_board)
-            return [beta, move]
 
-        for action in actions(current_board):
-            maxV = max_value(result(current_board, action), alpha, beta)[0]
+def value(cells, ply=0, stats=None):
+    """
+    Returns the minimax value of a tuple of cell digits: 1 if X wins
+    with best play, -1 if O wins, 0 for a draw.
 
-            if maxV < v:
-                v = maxV
-                beta = min(beta, v)
-                move = action
+    The search is recorded in stats, a stats.Stats, if one is given,
+    where ply is the number of moves from the position minimax was
+    asked about.
+    """
+    if stats is not None:
+        stats.node(ply)
+    key = canonical(cells)
+    if key in transpositions:
+        if stats is not None:
+            stats.table_hit(ply)
+        return transpositions[key]
 
-            if alpha >= beta:
-                break
+    for a, b, c in LINES:
+        if cells[a] and cells[a] == cells[b] == cells[c]:
+            v = 1 if cells[a] == DIGITS[X] else -1
+            break
+    else:
+        if 0 not in cells:
+            v = 0
+        else:
+            turn = DIGITS[X] if cells.count(1) == cells.count(2) else DIGITS[O]
+
+            # Values are from X's point of view, so flip them for O, and
+            # stop at the first win, as nothing can do better than it
+            sign = 1 if turn == DIGITS[X] else -1
+            v = -1
+            for i in range(9):
+                if cells[i] == 0:
+                    child = cells[:i] + (turn,) + cells[i + 1:]
+                    v = max(v, sign * value(child, ply + 1, stats))
+                    if v == 1:
+                        if stats is not None:
+                            stats.cutoff(ply)
+                        break
+            v *= sign
+
+    transpositions[key] = v
+    return v
+
+
+def minimax(board, stats=None):
+    """
+    Returns the optimal action for the current player on the board.
 
-        return [v, move]
+    Positions in the opening book are answered with a single lookup.
+    Others are valued through the transposition table, so every
+    position (up to symmetry) is searched at most once per process.
 
-    if current_player == X:
-        return max_value(board, -math.inf, math.inf)[1]
-    elif current_player == O:
-        return min_value(board, -math.inf, math.inf)[1]
+    If stats, a stats.Stats, is given, the nodes, win cutoffs and table
+    and book hits of the search are recorded in it by ply, with its time.
+    """
+    if terminal(board):
+        return None
+    if stats is not None:
+        start = time.perf_counter()
+        stats.node(0)
+
+    cells = tuple(DIGITS[cell] for row in board for cell in row)
+    key, symmetry = orient(cells)
+    if key in opening_book:
+        cell = SYMMETRIES[symmetry][opening_book[key][0]]
+        if stats is not None:
+            stats.book_hits += 1
+            stats.time += time.perf_counter() - start
+        return divmod(cell, 3)
+
+    turn = DIGITS[X] if cells.count(1) == cells.count(2) else DIGITS[O]
+    best_action = None
+    best = None
+    for i, j in sorted(actions(board)):
+        k = 3 * i + j
+        v = value(cells[:k] + (turn,) + cells[k + 1:], 1, stats)
+        if turn == DIGITS[O]:
+            v = -v
+        if best is None or v > best:
+            best, best_action = v, (i, j)
+    if stats is not None:
+        stats.time += time.perf_counter() - start
+    return best_action
@@ -0,0 +1,100 @@
+import sys
+import time
+
+from logic import *
+
+# Engines timed, with the most symbols each is timed on, if limited
+ENGINES = {
+    "enumerate": 16,
+    "compiled": 20,
+    "vectorized": 24,
+    "sat": None,
+}
+
+
+def character(i):
+    return Symbol(f"C{i} is a Knight"), Symbol(f"C{i} is a Knave")
+
+
+def says(speaker, statement, i):
+    """
+    Returns the knowledge that character speaker said statement,
+    alternating between the two encodings used in puzzle.py.
+    """
+    knight, knave = speaker
+    if i % 2:
+        return Biconditional(knight, statement)
+    return And(Implication(knight, statement),
+               Implication(knave, Not(statement)))
+
+
+def same_kind(first, second):
+    return Or(And(first[0], second[0]), And(first[1], second[1]))
+
+
+def scaled_puzzle(n):
+    """
+    Returns (knowledge, symbols) for a puzzle of n characters C0 ... Cn-1:
+    Cn-1 says "I am both a knight and a knave.", and every other character
+    Ci says "Ci+1 is a knave." and then either "C0 and Ci+1 are the same
+    kind." or "C0 and Ci+1 are of different kinds.", whichever keeps
+    the puzzle consistent.
+    """
+    characters = [character(i) for i in range(n)]
+    knowledge = []
+    for knight, knave in characters:
+        knowledge.append(Or(knight, knave))
+        knowledge.append(Not(And(knight, knave)))
+
+    # The solution: Cn-1 is a knave, and knights and knaves alternate
+    knights = [(n - 1 - i) % 2 == 1 for i in range(n)]
+
+    last = characters[-1]
+    knowledge.append(says(last, And(last[0], last[1]), n))
+    for i in range(n - 1):
+        speaker, following = characters[i], characters[i + 1]
+        knowledge.append(says(speaker, following[1], i))
+        statement = same_kind(characters[0], following)
+        if (knights[0] == knights[i + 1]) != knights[i]:
+            statement = Not(statement)
+        knowledge.append(says(speaker, statement, i + 1))
+    symbols = [symbol for pair in characters for symbol in pair]
+    return And(*knowledge), symbols
+
+
+def solve(knowledge, symbols, engine):
+    """
+    Returns the list of symbols the knowledge entails, and the seconds
+    taken to check them all.
+    """
+    start = time.perf_counter()
+    checks = model_check_all(knowledge, symbols, engine)
+    entailed = [symbol for symbol, check in zip(symbols, checks) if check]
+    return entailed, time.perf_counter() - start
+
+
+def main():
+    sizes = ([int(arg) for arg in sys.argv[1:]] if len(sys.argv) > 1
+             else [2, 4, 6, 8, 10, 12, 50, 100, 200, 400])
+    print(f"{'characters':>10} {'symbols':>8} {'engine':>10} "
+          f"{'seconds':>10} {'entailed':>9}")
+    for n in sizes:
+        knowledge, symbols = scaled_puzzle(n)
+        engines = [engine for engine, limit in ENGINES.items()
+                   if limit is None or len(symbols) <= limit]
+        answers = {}
+        for engine in engines:
+            entailed, elapsed = solve(knowledge, symbols, engine)
+            answers[engine] = entailed
+            print(f"{n:>10} {len(symbols):>8} {engine:>10} "
+                  f"{elapsed:>10.4f} {len(entailed):>9}")
+
+        # Every character's kind is determined by the statements
+        if len(set(map(tuple, answers.values()))) != 1:
+            sys.exit("Engines disagree.")
+        if len(answers["sat"]) != n:
+            sys.exit("Expected every character's kind to be entailed.")
+
+
+if __name__ == "__main__":
+    main()
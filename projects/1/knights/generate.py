@@ -0,0 +1,95 @@
+"""
+Random knights and knaves puzzles
+
+A puzzle has n characters C0 ... Cn-1, each secretly a knight or a
+knave, and m statements, each made by one character about one or two
+characters. Every statement is chosen to be true if its speaker is a
+knight and false if a knave, so the secret kinds are always a model of
+the knowledge, though they need not be the only one.
+"""
+
+import random
+import sys
+
+from benchmark import character, same_kind, says
+from logic import And, Implication, Not, Or, model_check_all
+
+
+def claim(characters, i, j, rng):
+    """
+    Returns (statement, text) for a random claim about the characters
+    of indices i and j.
+    """
+    first, second = characters[i], characters[j]
+    kind = rng.randrange(6)
+    if kind == 0:
+        return first[0], f"C{i} is a knight."
+    elif kind == 1:
+        return first[1], f"C{i} is a knave."
+    elif kind == 2:
+        return same_kind(first, second), f"C{i} and C{j} are the same kind."
+    elif kind == 3:
+        return Or(first[1], second[1]), f"C{i} or C{j} is a knave."
+    elif kind == 4:
+        return (Implication(first[0], second[1]),
+                f"If C{i} is a knight, then C{j} is a knave.")
+    return And(first[0], second[0]), f"C{i} and C{j} are both knights."
+
+
+def random_puzzle(n, m, rng=random):
+    """
+    Returns (knowledge, symbols, knights, lines) for a random puzzle of
+    n characters and m statements, where knights[i] is whether Ci is
+    secretly a knight and lines describes the statements.
+    """
+    characters = [character(i) for i in range(n)]
+    knights = [rng.random() < 0.5 for _ in range(n)]
+    model = {}
+    for (knight, knave), is_knight in zip(characters, knights):
+        model[knight.name] = is_knight
+        model[knave.name] = not is_knight
+
+    knowledge = []
+    for knight, knave in characters:
+        knowledge.append(Or(knight, knave))
+        knowledge.append(Not(And(knight, knave)))
+
+    # Draw claims until one is true exactly when its speaker is a knight
+    lines = []
+    for s in range(m):
+        speaker = rng.randrange(n)
+        while True:
+            i, j = rng.randrange(n), rng.randrange(max(n - 1, 1))
+            if n > 1 and j >= i:
+                j += 1
+            statement, text = claim(characters, i, j, rng)
+            if statement.evaluate(model) == knights[speaker]:
+                break
+        knowledge.append(says(characters[speaker], statement, s))
+        lines.append(f'C{speaker} says "{text}"')
+
+    symbols = [symbol for pair in characters for symbol in pair]
+    return And(*knowledge), symbols, knights, lines
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python generate.py n m [seed]")
+    n, m = int(sys.argv[1]), int(sys.argv[2])
+    rng = random.Random(sys.argv[3] if len(sys.argv) == 4 else None)
+    knowledge, symbols, knights, lines = random_puzzle(n, m, rng)
+    for line in lines:
+        print(line)
+    print("Entailed:")
+    for symbol, entailed in zip(symbols,
+                                model_check_all(knowledge, symbols, "sat")):
+        if entailed:
+            print(f"    {symbol}")
+    print("Solution:", ", ".join(
+        f"C{i} is a {'knight' if knight else 'knave'}"
+        for i, knight in enumerate(knights)
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,65 @@
 import itertools
+import weakref
 
 
 class Sentence():
+    """
+    Sentences are immutable and hash-consed: building a sentence equal to
+    one that exists returns that one, so equal sentences are the same
+    object, compared and hashed by identity in constant time. Each
+    sentence caches its set of symbols once asked for it.
+
+    Each class keeps weak references to its sentences in a dict, keyed
+    by what the sentence already holds where possible (a name, an operand
+    or a tuple of operands), so that a sentence no longer used elsewhere
+    is freed. The entries of freed sentences are swept out whenever the
+    dict has doubled in size since the last sweep.
+    """
+    __slots__ = ("_symbols", "__weakref__")
+
+    # Size of a class's table at which its next sweep is due
+    sweep_at = 1024
+
+    @staticmethod
+    def intern(cls, key, **fields):
+        """
+        Returns the sentence of class cls for key in cls.interned,
+        creating it with the given fields if it does not exist.
+        """
+        ref = cls.interned.get(key)
+        sentence = None if ref is None else ref()
+        if sentence is None:
+            sentence = object.__new__(cls)
+            for name, value in fields.items():
+                object.__setattr__(sentence, name, value)
+            object.__setattr__(sentence, "_symbols", None)
+            cls.interned[key] = weakref.ref(sentence)
+            if len(cls.interned) >= cls.sweep_at:
+                Sentence.sweep(cls)
+        return sentence
+
+    @staticmethod
+    def sweep(cls):
+        """
+        Removes the entries of freed sentences from the table of cls.
+        """
+        interned = cls.interned
+        for key in [key for key, ref in interned.items() if ref() is None]:
+            del interned[key]
+        cls.sweep_at = max(2 * len(interned), Sentence.sweep_at)
+
+    # Equal sentences are the same object
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("sentences are immutable")
+
+    def __reduce__(self):
+        return type(self), self.operands()
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -11,9 +69,44 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def operands(self):
+        """Returns a tuple of the sentences the logical sentence joins."""
+        return ()
+
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        if self._symbols is None:
+
+            # Visit each distinct subformula once
+            names = set()
+            seen = set()
+            pending = [self]
+            while pending:
+                sentence = pending.pop()
+                if sentence._symbols is not None:
+                    names.update(sentence._symbols)
+                elif isinstance(sentence, Symbol):
+                    names.add(sentence.name)
+                elif sentence not in seen:
+                    seen.add(sentence)
+                    pending.extend(sentence.operands())
+            object.__setattr__(self, "_symbols", frozenset(names))
+        return self._symbols
+
+    def python(self, index):
+        """
+        Returns a Python expression evaluating the logical sentence in a
+        model packed as the int m, where symbol name is bit index[name].
+        """
+        raise Exception("nothing to compile")
+
+    def bits(self, model, full):
+        """
+        Evaluates the logical sentence in many models at once: model maps
+        each symbol to a bitset (an int or a NumPy array) of its values,
+        full is the bitset of all ones, and the result is a bitset.
+        """
+        raise Exception("nothing to evaluate")
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +136,14 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+    interned = {}
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def __new__(cls, name):
+        return Sentence.intern(cls, name, name=name)
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __reduce__(self):
+        return Symbol, (self.name,)
 
     def __repr__(self):
         return self.name
@@ -65,20 +157,29 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def python(self, index):
+        try:
+            return f"(m >> {index[self.name]} & 1)"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def bits(self, model, full):
+        try:
+            return model[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
+    interned = {}
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return Sentence.intern(cls, operand, operand=operand)
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def operands(self):
+        return (self.operand,)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +190,24 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def python(self, index):
+        return f"(not {self.operand.python(index)})"
+
+    def bits(self, model, full):
+        return self.operand.bits(model, full) ^ full
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+    interned = {}
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        return Sentence.intern(cls, conjuncts, conjuncts=conjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    def operands(self):
+        return self.conjuncts
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +216,11 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        """
+        Returns a new And with conjunct added, as sentences are immutable:
+        write knowledge = knowledge.add(conjunct) to add to knowledge.
+        """
+        return And(*self.conjuncts, conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +231,31 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def python(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.python(index) for conjunct in self.conjuncts
+        ) + ")"
+
+    def bits(self, model, full):
+        result = full
+        for conjunct in self.conjuncts:
+            result = result & conjunct.bits(model, full)
+        return result
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+    interned = {}
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return Sentence.intern(cls, disjuncts, disjuncts=disjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    def operands(self):
+        return self.disjuncts
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +270,32 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def python(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.python(index) for disjunct in self.disjuncts
+        ) + ")"
+
+    def bits(self, model, full):
+        result = full ^ full
+        for disjunct in self.disjuncts:
+            result = result | disjunct.bits(model, full)
+        return result
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+    interned = {}
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return Sentence.intern(cls, (antecedent, consequent),
+                               antecedent=antecedent, consequent=consequent)
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    def operands(self):
+        return (self.antecedent, self.consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,45 +309,88 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def python(self, index):
+        antecedent = self.antecedent.python(index)
+        consequent = self.consequent.python(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def bits(self, model, full):
+        antecedent = self.antecedent.bits(model, full)
+        return (antecedent ^ full) | self.consequent.bits(model, full)
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+    interned = {}
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return Sentence.intern(cls, (left, right),
+                               left=left, right=right)
 
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    def operands(self):
+        return (self.left, self.right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def python(self, index):
+        left = self.left.python(index)
+        right = self.right.python(index)
+        return f"((not {left}) == (not {right}))"
+
+    def bits(self, model, full):
+        left = self.left.bits(model, full)
+        return left ^ self.right.bits(model, full) ^ full
+
+
+def compile_sentence(sentence, index):
+    """
+    Returns a function evaluating sentence in a model packed as an int,
+    where symbol name is bit index[name], compiled to Python bytecode.
+    """
+    return eval(f"lambda m: {sentence.python(index)}")
+
+
+def model_check(knowledge, query, engine="enumerate", simplify=False):
+    """
+    Checks if knowledge base entails query.
+
+    The "enumerate" engine checks every model of the symbols. The
+    "compiled" engine checks every model too, packed as ints and
+    evaluated by compiled sentences, and the "vectorized" engine checks
+    blocks of models at once as bitsets with truthtable.py. The "sat"
+    engine decides entailment with the CDCL solver in sat.py instead.
+
+    If simplify is True, knowledge and query are first simplified by
+    normalize.py. That is off by default, as it costs more than it saves
+    on the puzzles of puzzle.py and on the generated ones of suite.py,
+    which times both.
+    """
+    if simplify:
+        import normalize
+        knowledge = normalize.simplify(knowledge)
+        query = normalize.simplify(query)
+
+    if engine == "compiled":
+        return compiled_check(knowledge, query)
+    elif engine == "vectorized":
+        import truthtable
+        return truthtable.entails(knowledge, query)
+    elif engine == "sat":
+        import sat
+        return sat.entails(knowledge, query)
+    elif engine != "enumerate":
+        raise ValueError(f"unknown engine {engine}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +421,83 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def compiled_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by evaluating a compiled
+    "knowledge implies query" in every model, each packed as an int.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    check = compile_sentence(Implication(knowledge, query), index)
+    return all(map(check, range(2 ** len(symbols))))
+
+
+def model_check_all(knowledge, queries, engine="enumerate",
+                    simplify=False):
+    """
+    Returns a list of whether knowledge base entails each of queries,
+    checking them all together with one of the engines of model_check,
+    after simplifying them if simplify is True.
+
+    The model checking engines go over the models of the symbols once,
+    stopping early when no query can still be entailed, and the "sat"
+    engine decides every query with one solver, assuming each query
+    false in turn.
+    """
+    if simplify:
+        import normalize
+        simplifier = normalize.Simplifier()
+        knowledge = simplifier.rewrite(knowledge)
+        queries = [simplifier.rewrite(query) for query in queries]
+
+    if engine == "compiled":
+        return compiled_check_all(knowledge, queries)
+    elif engine == "vectorized":
+        import truthtable
+        return truthtable.entails_all(knowledge, queries)
+    elif engine == "sat":
+        import sat
+        return sat.entails_all(knowledge, queries)
+    elif engine != "enumerate":
+        raise ValueError(f"unknown engine {engine}")
+
+    # Get all symbols in knowledge and in every query
+    symbols = sorted(knowledge.symbols().union(
+        *(query.symbols() for query in queries)
+    ))
+
+    # Queries true in every model of knowledge base seen so far
+    entailed = set(range(len(queries)))
+    for values in itertools.product([True, False], repeat=len(symbols)):
+        if not entailed:
+            break
+        model = dict(zip(symbols, values))
+        if knowledge.evaluate(model):
+            entailed = {i for i in entailed if queries[i].evaluate(model)}
+    return [i in entailed for i in range(len(queries))]
+
+
+def compiled_check_all(knowledge, queries):
+    """
+    Checks if knowledge base entails each of queries, by evaluating the
+    compiled queries in every model, packed as an int, in which the
+    compiled knowledge is true.
+    """
+    symbols = sorted(knowledge.symbols().union(
+        *(query.symbols() for query in queries)
+    ))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    check = compile_sentence(knowledge, index)
+    checks = [compile_sentence(query, index) for query in queries]
+    entailed = set(range(len(queries)))
+    for model in filter(check, range(2 ** len(symbols))):
+        entailed = {i for i in entailed if checks[i](model)}
+        if not entailed:
+            break
+    return [i in entailed for i in range(len(queries))]
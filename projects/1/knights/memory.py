@@ -0,0 +1,89 @@
+"""
+Memory used by knowledge bases of shared sentences
+
+Sentences are interned, so a sentence built again anywhere in a
+knowledge base is the same object. For each puzzle, prints the number
+of nodes the knowledge would have as a tree, the number of distinct
+sentences actually built, and the memory they take.
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmark import scaled_puzzle
+from generate import random_puzzle
+
+
+def tree_size(sentence, sizes=None):
+    """
+    Returns the number of nodes of sentence written out as a tree,
+    counting each shared sentence once for every place it appears.
+    """
+    if sizes is None:
+        sizes = {}
+    size = sizes.get(sentence)
+    if size is None:
+        size = 1 + sum(tree_size(operand, sizes)
+                       for operand in sentence.operands())
+        sizes[sentence] = size
+    return size
+
+
+def distinct(sentence):
+    """
+    Returns the number of distinct sentences in sentence.
+    """
+    seen = {sentence}
+    stack = [sentence]
+    while stack:
+        for operand in stack.pop().operands():
+            if operand not in seen:
+                seen.add(operand)
+                stack.append(operand)
+    return len(seen)
+
+
+def measure(build):
+    """
+    Returns (knowledge, seconds, bytes) for the knowledge returned by
+    build(), with the bytes it allocated.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    knowledge = build()
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return knowledge, elapsed, allocated
+
+
+def main():
+    sizes = ([int(arg) for arg in sys.argv[1:]] if len(sys.argv) > 1
+             else [100, 1000, 2000])
+    puzzles = []
+    for n in sizes:
+        puzzles.append((f"scaled {n}", lambda n=n: scaled_puzzle(n)[0]))
+    for n in sizes:
+
+        # Few characters and many statements, so that claims repeat
+        puzzles.append((f"random 8x{n}", lambda n=n: random_puzzle(
+            8, n, random.Random(n)
+        )[0]))
+
+    print(f"{'puzzle':>14} {'tree':>10} {'distinct':>9} "
+          f"{'seconds':>8} {'MB':>7} {'bytes/tree node':>16}")
+    for name, build in puzzles:
+        knowledge, elapsed, allocated = measure(build)
+        nodes = tree_size(knowledge)
+        print(f"{name:>14} {nodes:>10} {distinct(knowledge):>9} "
+              f"{elapsed:>8.3f} {allocated / 1e6:>7.2f} "
+              f"{allocated / nodes:>16.1f}")
+
+        # Free its sentences before measuring the next
+        del knowledge
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Simplification and normal forms
+
+simplify rewrites a sentence into an equivalent one that is no larger:
+it folds constants, removes double negations, flattens nested
+conjunctions and disjunctions, and sorts their operands to remove
+duplicates, so that Or(And(A, B), And(B, A)) becomes And(A, B). True is
+written And() and false is written Or(), which evaluate to those values.
+
+nnf does the same, and also rewrites the sentence into negation normal
+form, where Not applies only to symbols and the only other connectives
+are And and Or. That removes every implication and biconditional, at
+the cost of writing both operands of a biconditional twice. cnf and dnf
+go on to distribute it into a conjunction of clauses or a disjunction
+of terms. Either can be exponentially larger than the sentence, so they
+give up past a limit on how many clauses or terms there are.
+
+Simplification is opt-in for model_check and model_check_all. main
+here, and suite.py on generated puzzles, time every engine without and
+with it.
+"""
+
+import sys
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+from logic import model_check_all
+
+# Most clauses or terms cnf and dnf build before giving up
+LIMIT = 1000
+
+TRUE = And()
+FALSE = Or()
+
+
+class TooLarge(Exception):
+    pass
+
+
+class Simplifier():
+    """
+    Rewrites sentences into simplified ones, in negation normal form if
+    nnf is True, remembering the result for every subformula and
+    polarity it has rewritten.
+    """
+
+    def __init__(self, nnf=False):
+        self.nnf = nnf
+        self.rewritten = {}
+        self.keys = {}
+
+    def key(self, sentence):
+        """
+        Returns a number to sort operands by: the order in which this
+        simplifier first sorted them, which is the same in every run.
+        """
+        return self.keys.setdefault(sentence, len(self.keys))
+
+    def rewrite(self, sentence, negated=False):
+        """
+        Returns a simplified sentence equivalent to sentence, or to its
+        negation if negated.
+        """
+        if (sentence, negated) in self.rewritten:
+            return self.rewritten[sentence, negated]
+
+        if isinstance(sentence, Symbol):
+            result = Not(sentence) if negated else sentence
+        elif isinstance(sentence, Not):
+            result = self.rewrite(sentence.operand, not negated)
+        elif negated and not self.nnf:
+            result = self.negate(self.rewrite(sentence))
+        elif isinstance(sentence, (And, Or)):
+            operands = [self.rewrite(operand, negated)
+                        for operand in sentence.operands()]
+
+            # The negation of an And is an Or of negations, and vice versa
+            if isinstance(sentence, And) != negated:
+                result = self.join(And, operands)
+            else:
+                result = self.join(Or, operands)
+        elif isinstance(sentence, Implication) and not self.nnf:
+            result = self.implication(self.rewrite(sentence.antecedent),
+                                      self.rewrite(sentence.consequent))
+        elif isinstance(sentence, Biconditional) and not self.nnf:
+            result = self.biconditional(self.rewrite(sentence.left),
+                                        self.rewrite(sentence.right))
+        elif isinstance(sentence, Implication):
+
+            # a => b is ¬a ∨ b, and its negation is a ∧ ¬b
+            antecedent = self.rewrite(sentence.antecedent, not negated)
+            consequent = self.rewrite(sentence.consequent, negated)
+            result = self.join(And if negated else Or,
+                               [antecedent, consequent])
+        elif isinstance(sentence, Biconditional):
+
+            # a <=> b is (¬a ∨ b) ∧ (a ∨ ¬b); its negation is a <=> ¬b
+            left = self.rewrite(sentence.left)
+            not_left = self.rewrite(sentence.left, True)
+            right = self.rewrite(sentence.right, negated)
+            not_right = self.rewrite(sentence.right, not negated)
+            result = self.join(And, [self.join(Or, [not_left, right]),
+                                     self.join(Or, [left, not_right])])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.rewritten[sentence, negated] = result
+        return result
+
+    def join(self, cls, operands):
+        """
+        Returns the And or Or, as cls, of simplified operands: flattened,
+        without duplicates or operands that cannot change it, and folded
+        to a constant if an operand decides it or two are complementary.
+        """
+        absorbing = FALSE if cls is And else TRUE
+        joined = {}
+        for operand in operands:
+            if operand is absorbing:
+                return absorbing
+            elif isinstance(operand, cls):
+                joined.update(dict.fromkeys(operand.operands()))
+            else:
+                joined[operand] = None
+        for operand in joined:
+            if isinstance(operand, Not) and operand.operand in joined:
+                return absorbing
+        if len(joined) == 1:
+            return next(iter(joined))
+        return cls(*sorted(joined, key=self.key))
+
+    def negate(self, sentence):
+        """
+        Returns the negation of a simplified sentence.
+        """
+        if sentence is TRUE:
+            return FALSE
+        elif sentence is FALSE:
+            return TRUE
+        elif isinstance(sentence, Not):
+            return sentence.operand
+        return Not(sentence)
+
+    def implication(self, antecedent, consequent):
+        """
+        Returns antecedent => consequent, for simplified operands, as the
+        simpler ¬antecedent ∨ consequent if that folds.
+        """
+        negation = self.negate(antecedent)
+        if (antecedent in (TRUE, FALSE) or consequent in (TRUE, FALSE)
+                or consequent in (antecedent, negation)):
+            return self.join(Or, [negation, consequent])
+        return Implication(antecedent, consequent)
+
+    def biconditional(self, left, right):
+        """
+        Returns left <=> right, for simplified operands, folded if one is
+        constant or they are equal or complementary.
+        """
+        if left is right:
+            return TRUE
+        elif self.negate(left) is right:
+            return FALSE
+        elif left in (TRUE, FALSE):
+            return right if left is TRUE else self.negate(right)
+        elif right in (TRUE, FALSE):
+            return left if right is TRUE else self.negate(left)
+        left, right = sorted([left, right], key=self.key)
+        return Biconditional(left, right)
+
+
+def simplify(sentence):
+    """
+    Returns a simplified sentence equivalent to sentence.
+    """
+    return Simplifier().rewrite(sentence)
+
+
+def nnf(sentence):
+    """
+    Returns a simplified sentence in negation normal form equivalent to
+    sentence.
+    """
+    return Simplifier(nnf=True).rewrite(sentence)
+
+
+def distribute(sentence, outer, limit):
+    """
+    Returns sentence as an outer And of Ors (CNF) or an outer Or of Ands
+    (DNF) of literals, or None if that takes more than limit of them.
+    """
+    inner = Or if outer is And else And
+
+    def groups(sentence):
+        """
+        Returns the set of inner groups of sentence, each a frozenset of
+        literals, leaving out those that are constant.
+        """
+        if isinstance(sentence, outer):
+            result = set()
+            for operand in sentence.operands():
+                result |= groups(operand)
+        elif isinstance(sentence, inner):
+            result = {frozenset()}
+            for operand in sentence.operands():
+                other = groups(operand)
+                if len(result) * len(other) > limit:
+                    raise TooLarge
+                result = {group | literals
+                          for group in result for literals in other}
+
+                # A clause with a literal and its negation is true, and
+                # a term with both is false
+                result = {group for group in result
+                          if not any(isinstance(literal, Not)
+                                     and literal.operand in group
+                                     for literal in group)}
+        else:
+            result = {frozenset([sentence])}
+        if len(result) > limit:
+            raise TooLarge
+        return result
+
+    simplifier = Simplifier(nnf=True)
+    sentence = simplifier.rewrite(sentence)
+    try:
+        return simplifier.join(outer, [simplifier.join(inner, group)
+                                       for group in groups(sentence)])
+    except TooLarge:
+        return None
+
+
+def cnf(sentence, limit=LIMIT):
+    """
+    Returns an equivalent sentence in conjunctive normal form, an And of
+    Ors of literals, or None if it has more than limit clauses.
+    """
+    return distribute(sentence, And, limit)
+
+
+def dnf(sentence, limit=LIMIT):
+    """
+    Returns an equivalent sentence in disjunctive normal form, an Or of
+    Ands of literals, or None if it has more than limit terms.
+    """
+    return distribute(sentence, Or, limit)
+
+
+def size(sentence, sizes=None):
+    """
+    Returns the number of symbols and connectives written in sentence.
+    """
+    if sizes is None:
+        sizes = {}
+    if sentence not in sizes:
+        sizes[sentence] = 1 + sum(size(operand, sizes)
+                                  for operand in sentence.operands())
+    return sizes[sentence]
+
+
+def timed(knowledge, symbols, engine, simplify, repeat):
+    """
+    Returns the answers of checking every symbol, and the fewest seconds
+    that took in repeat tries.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        answers = model_check_all(knowledge, symbols, engine,
+                                  simplify=simplify)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return answers, best
+
+
+def main():
+    """
+    Prints the time of checking every symbol of the puzzles in puzzle.py
+    and of benchmark puzzles, without and with simplification, which is
+    timed as part of the check, for every engine.
+    """
+    import benchmark
+    import puzzle
+
+    sizes = ([int(arg) for arg in sys.argv[1:]] if len(sys.argv) > 1
+             else [4, 8, 12, 100])
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    puzzles = [(f"Puzzle {i}", knowledge, symbols)
+               for i, knowledge in enumerate([
+                   puzzle.knowledge0, puzzle.knowledge1,
+                   puzzle.knowledge2, puzzle.knowledge3
+               ])]
+    for n in sizes:
+        puzzles.append((f"{n} characters",) + benchmark.scaled_puzzle(n))
+
+    print(f"{'puzzle':>15} {'size':>11} {'engine':>10} "
+          f"{'seconds':>10} {'simplified':>10} {'speedup':>8}")
+    for name, knowledge, symbols in puzzles:
+        before = size(knowledge)
+        after = size(simplify(knowledge))
+        for engine, limit in benchmark.ENGINES.items():
+            if limit is not None and len(symbols) > limit:
+                continue
+            repeat = 20 if len(symbols) <= 12 else 1
+            answers, plain = timed(knowledge, symbols, engine, False,
+                                   repeat)
+            simplified_answers, simplified = timed(knowledge, symbols,
+                                                   engine, True, repeat)
+            print(f"{name:>15} {f'{before}->{after}':>11} {engine:>10} "
+                  f"{plain:>10.5f} {simplified:>10.5f} "
+                  f"{plain / simplified:>7.2f}x")
+            if answers != simplified_answers:
+                sys.exit("Simplification changed the answers.")
+
+
+if __name__ == "__main__":
+    main()
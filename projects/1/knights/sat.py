@@ -0,0 +1,413 @@
+"""
+SAT-based entailment
+
+Knowledge entails a query exactly when knowledge ∧ ¬query has no model.
+Sentences are converted to clauses by the Tseitin transformation, which
+names every compound subformula with a new variable so that the clauses
+grow linearly with the sentence, and the clauses are decided by a CDCL
+solver with two watched literals per clause, unit propagation, first-UIP
+clause learning, activity-based decisions and restarts.
+
+Literals are nonzero ints: variable v is the literal v, and its
+negation is -v.
+"""
+
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Conflicts before the first restart, and the growth of that limit
+RESTART_FIRST = 100
+RESTART_GROWTH = 1.5
+
+# Decay of variable activity after every conflict
+ACTIVITY_DECAY = 0.95
+
+
+class Solver():
+    """
+    CDCL SAT solver. Clauses can be added between calls to solve, which
+    keeps everything learned by earlier calls.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.watches = {}
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.increment = 1.0
+        self.order = []
+        self.unsatisfiable = False
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def new_var(self):
+        var = len(self.values)
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        self.watches[var] = []
+        self.watches[-var] = []
+        heapq.heappush(self.order, (0.0, var))
+        return var
+
+    def value(self, literal):
+        """
+        Returns 1 if literal is true, -1 if false, 0 if unassigned.
+        """
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause, a list of literals at least one of which is true.
+        Returns False if the clauses are now unsatisfiable.
+        """
+        if self.unsatisfiable:
+            return False
+        self.backtrack(0)
+        clause = []
+        for literal in literals:
+            if -literal in clause or self.value(literal) == 1:
+                return True
+            if literal not in clause and self.value(literal) == 0:
+                clause.append(literal)
+        if not clause:
+            self.unsatisfiable = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.unsatisfiable = True
+        else:
+            self.attach(clause)
+        return not self.unsatisfiable
+
+    def attach(self, clause):
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.values[var] = 1 if literal > 0 else -1
+        self.levels[var] = len(self.trail_limits)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses, returning the
+        first clause found false, or None.
+        """
+        values = self.values
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            watching = self.watches[false]
+            kept = []
+            i = 0
+            while i < len(watching):
+                clause = watching[i]
+                i += 1
+
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                first_value = values[abs(first)]
+                if (first_value if first > 0 else -first_value) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if any
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = values[abs(literal)]
+                    if (value if literal > 0 else -value) != -1:
+                        clause[1], clause[k] = literal, false
+                        self.watches[literal].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if (first_value if first > 0 else -first_value) == -1:
+                        kept.extend(watching[i:])
+                        self.watches[false] = kept
+                        return clause
+                    self.assign(first, clause)
+            self.watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learned clause, level to backtrack to) for a conflict,
+        by resolving it back to the first unique implication point.
+        The learned clause's first literal is asserted after backtracking.
+        """
+        level = len(self.trail_limits)
+        learned = [0]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                if other == literal:
+                    continue
+                var = abs(other)
+                if var in seen or self.levels[var] == 0:
+                    continue
+                seen.add(var)
+                self.bump(var)
+                if self.levels[var] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Resolve with the reason of the latest literal involved
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        highest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            for other in range(1, len(self.activity)):
+                self.activity[other] *= 1e-100
+            self.increment *= 1e-100
+            self.order = [(-self.activity[other], other)
+                          for other in range(1, len(self.values))
+                          if self.values[other] == 0]
+            heapq.heapify(self.order)
+        elif self.values[var] == 0:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.values[var] = 0
+            self.reasons[var] = None
+            self.phases[var] = literal > 0
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """
+        Returns the unassigned variable of highest activity, or None.
+        """
+        while self.order:
+            activity, var = heapq.heappop(self.order)
+            if self.values[var] == 0 and -activity == self.activity[var]:
+                return var
+        for var in range(1, len(self.values)):
+            if self.values[var] == 0:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses and assumptions, a list of literals,
+        can all be satisfied, leaving a model in model(); False if not.
+        """
+        if self.unsatisfiable:
+            return False
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.unsatisfiable = True
+            return False
+
+        limit = RESTART_FIRST
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.attach(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= ACTIVITY_DECAY
+                continue
+
+            if conflicts >= limit:
+                conflicts = 0
+                limit *= RESTART_GROWTH
+                self.backtrack(0)
+                continue
+
+            # Decide the assumptions first, one level each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                if self.value(literal) == -1:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if self.value(literal) == 0:
+                    self.assign(literal, None)
+                continue
+
+            var = self.decide()
+            if var is None:
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(var if self.phases[var] else -var, None)
+
+    def model(self):
+        """
+        Returns the set of variables true in the last model found.
+        """
+        return {var for var in range(1, len(self.values))
+                if self.values[var] == 1}
+
+
+class Encoder():
+    """
+    Tseitin encoding of Sentences into clauses of a Solver, giving each
+    symbol and each distinct compound subformula one variable.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver if solver is not None else Solver()
+        self.variables = {}
+        self.literals = {}
+        self.true = None
+
+    def symbol(self, name):
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_var()
+        return self.variables[name]
+
+    def constant(self, value):
+        if self.true is None:
+            self.true = self.solver.new_var()
+            self.solver.add_clause([self.true])
+        return self.true if value else -self.true
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to sentence, adding the clauses
+        that define the variables of its compound subformulas.
+        """
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        add = self.solver.add_clause
+        if isinstance(sentence, (And, Or)):
+            conjunction = isinstance(sentence, And)
+            operands = (sentence.conjuncts if conjunction
+                        else sentence.disjuncts)
+            if not operands:
+                return self.constant(conjunction)
+            operands = [self.literal(operand) for operand in operands]
+
+            # An And is an Or of negations, negated
+            if conjunction:
+                operands = [-operand for operand in operands]
+            var = self.solver.new_var()
+            for operand in operands:
+                add([var, -operand])
+            add([-var] + operands)
+            literal = -var if conjunction else var
+        elif isinstance(sentence, Implication):
+            antecedent = self.literal(sentence.antecedent)
+            consequent = self.literal(sentence.consequent)
+            literal = self.solver.new_var()
+            add([literal, antecedent])
+            add([literal, -consequent])
+            add([-literal, -antecedent, consequent])
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.solver.new_var()
+            add([-literal, -left, right])
+            add([-literal, left, -right])
+            add([literal, left, right])
+            add([literal, -left, -right])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def assert_true(self, sentence):
+        """
+        Adds clauses that hold exactly when sentence is true, without
+        naming the conjunctions and disjunctions at its top.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.assert_true(conjunct)
+        elif isinstance(sentence, Or):
+            self.solver.add_clause([self.literal(disjunct)
+                                    for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.solver.add_clause([-self.literal(sentence.antecedent),
+                                    self.literal(sentence.consequent)])
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Not):
+            self.assert_true(sentence.operand.operand)
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Or):
+            for disjunct in sentence.operand.disjuncts:
+                self.assert_true(Not(disjunct))
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+
+def entails(knowledge, query):
+    """
+    Returns True if knowledge entails query, deciding whether
+    knowledge ∧ ¬query is satisfiable.
+    """
+    return entails_all(knowledge, [query])[0]
+
+
+def entails_all(knowledge, queries):
+    """
+    Returns a list of whether knowledge entails each of queries. The
+    knowledge is encoded once, and each query is assumed false in turn
+    in the same solver, which keeps the clauses learned for every query.
+    """
+    encoder = Encoder()
+    encoder.assert_true(knowledge)
+    return [not encoder.solver.solve([-encoder.literal(query)])
+            for query in queries]
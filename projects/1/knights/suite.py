@@ -0,0 +1,154 @@
+import csv
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmark import ENGINES
+from generate import random_puzzle
+from logic import model_check_all
+
+USAGE = ("Usage: python suite.py [--statements M] [--puzzles P] "
+         "[--seed SEED] [--csv FILE] [--json FILE] [n ...]")
+
+# Characters in the puzzles timed by default
+SIZES = [2, 4, 6, 8, 10, 12, 16, 25, 50, 100]
+
+# Columns of the CSV output, one per key of a result
+FIELDS = ["characters", "statements", "puzzle", "engine", "simplified",
+          "symbols", "seconds", "entailed"]
+
+
+def run_suite(sizes, statements, puzzles, seed):
+    """
+    Times every engine on puzzles random puzzles of each size in sizes,
+    with statements statements per character, without and with
+    simplifying the knowledge first. Returns the list of results, one
+    dict per puzzle, engine and simplification, and a list of problems
+    found: engines disagreeing, or entailing a kind that is not the
+    puzzle's secret solution.
+    """
+    results = []
+    problems = []
+    for n in sizes:
+        for p in range(puzzles):
+            rng = random.Random(f"{seed}-{n}-{p}")
+            knowledge, symbols, knights, _ = random_puzzle(
+                n, statements * n, rng
+            )
+            solution = [value for knight in knights
+                        for value in (knight, not knight)]
+            answers = {}
+            for engine, limit in ENGINES.items():
+                if limit is not None and len(symbols) > limit:
+                    continue
+                for simplify in [False, True]:
+                    start = time.perf_counter()
+                    entailed = model_check_all(knowledge, symbols, engine,
+                                               simplify=simplify)
+                    elapsed = time.perf_counter() - start
+                    answers[engine, simplify] = entailed
+                    results.append({
+                        "characters": n,
+                        "statements": statements * n,
+                        "puzzle": p,
+                        "engine": engine,
+                        "simplified": simplify,
+                        "symbols": len(symbols),
+                        "seconds": elapsed,
+                        "entailed": sum(entailed),
+                    })
+                    if any(check and not value
+                           for check, value in zip(entailed, solution)):
+                        problems.append(f"{engine} entails a wrong kind "
+                                        f"in puzzle {p} of {n} characters")
+            if len(set(map(tuple, answers.values()))) != 1:
+                problems.append(f"Engines disagree on puzzle {p} of "
+                                f"{n} characters")
+    return results, problems
+
+
+def main():
+    args = sys.argv[1:]
+    sizes = []
+    statements = 2
+    puzzles = 3
+    seed = "knights"
+    csv_output = None
+    json_output = None
+    while args:
+        arg = args.pop(0)
+        if not arg.startswith("--"):
+            sizes.append(int(arg))
+            continue
+        if not args:
+            sys.exit(USAGE)
+        value = args.pop(0)
+        if arg == "--statements":
+            statements = int(value)
+        elif arg == "--puzzles":
+            puzzles = int(value)
+        elif arg == "--seed":
+            seed = value
+        elif arg == "--csv":
+            csv_output = value
+        elif arg == "--json":
+            json_output = value
+        else:
+            sys.exit(USAGE)
+    sizes = sizes or SIZES
+
+    start = time.perf_counter()
+    results, problems = run_suite(sizes, statements, puzzles, seed)
+    elapsed = time.perf_counter() - start
+
+    # Mean seconds for each size and engine, without and with
+    # simplification
+    print(f"{'characters':>10} {'symbols':>8} {'engine':>10} "
+          f"{'seconds':>10} {'simplified':>10} {'entailed':>9}")
+    for n in sizes:
+        for engine in ENGINES:
+            rows = [result for result in results
+                    if result["characters"] == n
+                    and result["engine"] == engine]
+            if not rows:
+                continue
+            seconds = [
+                sum(row["seconds"] for row in rows
+                    if row["simplified"] == simplify) / (len(rows) / 2)
+                for simplify in [False, True]
+            ]
+            entailed = sum(row["entailed"] for row in rows) / len(rows)
+            print(f"{n:>10} {rows[0]['symbols']:>8} {engine:>10} "
+                  f"{seconds[0]:>10.4f} {seconds[1]:>10.4f} "
+                  f"{entailed:>9.1f}")
+    print(f"{len(results)} checks in {elapsed:.2f} s")
+
+    if csv_output is not None:
+        with open(csv_output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    if json_output is not None:
+        report = {
+            "sizes": sizes,
+            "statements_per_character": statements,
+            "puzzles": puzzles,
+            "seed": seed,
+            "elapsed": elapsed,
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+            "problems": problems,
+        }
+        with open(json_output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if problems:
+        sys.exit("\n".join(problems))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import itertools
+import random
+
+import sat
+from generate import random_puzzle
+from logic import *
+from suite import run_suite
+
+ENGINES = ["enumerate", "compiled", "vectorized", "sat"]
+
+SYMBOLS = [Symbol(name) for name in "ABCDEF"]
+
+
+def random_sentence(rng, depth):
+    """Returns a random sentence of the symbols, depth connectives deep."""
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(SYMBOLS)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(rng, depth - 1))
+    elif kind in [1, 2]:
+        operands = [random_sentence(rng, depth - 1)
+                    for _ in range(rng.randrange(1, 4))]
+        return And(*operands) if kind == 1 else Or(*operands)
+    elif kind == 3:
+        return Implication(random_sentence(rng, depth - 1),
+                           random_sentence(rng, depth - 1))
+    return Biconditional(random_sentence(rng, depth - 1),
+                         random_sentence(rng, depth - 1))
+
+
+def entailed(knowledge, query):
+    """Checks entailment by evaluating every model of the symbols."""
+    for values in itertools.product([False, True], repeat=len(SYMBOLS)):
+        model = {symbol.name: value
+                 for symbol, value in zip(SYMBOLS, values)}
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
+
+
+def test_engines_agree_on_random_knowledge():
+    rng = random.Random(0)
+    for _ in range(150):
+        knowledge = And(*(random_sentence(rng, 3)
+                          for _ in range(rng.randrange(1, 5))))
+        queries = [random_sentence(rng, 2) for _ in range(4)]
+        queries += SYMBOLS[:2]
+        expected = [entailed(knowledge, query) for query in queries]
+        for engine in ENGINES:
+            assert [model_check(knowledge, query, engine)
+                    for query in queries] == expected, engine
+            assert model_check_all(knowledge, queries, engine) == expected
+        assert model_check_all(knowledge, queries, "sat",
+                               simplify=True) == expected
+
+
+def test_unsatisfiable_knowledge_entails_everything():
+    A, B = SYMBOLS[:2]
+    knowledge = And(A, Not(A))
+    for engine in ENGINES:
+        assert model_check_all(knowledge, [B, Not(B)], engine) == [True, True]
+    assert model_check_all(And(), [Or(A, Not(A)), A], "sat") == [True, False]
+
+
+def test_generated_puzzles_are_solved():
+    _, problems = run_suite([2, 4, 6], 2, 3, seed=0)
+    assert problems == []
+
+
+def test_sat_solves_large_puzzles():
+    rng = random.Random(1)
+    for n in [25, 50]:
+        knowledge, symbols, knights, _ = random_puzzle(n, 3 * n, rng)
+        solution = [value for knight in knights
+                    for value in (knight, not knight)]
+        answers = sat.entails_all(knowledge, symbols)
+        assert not any(answer and not value
+                       for answer, value in zip(answers, solution))
+        for symbol, answer in list(zip(symbols, answers))[:6]:
+            assert sat.entails(knowledge, symbol) == answer
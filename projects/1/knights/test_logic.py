@@ -0,0 +1,40 @@
+import copy
+import pickle
+
+from logic import *
+
+A, B, C = Symbol("A"), Symbol("B"), Symbol("C")
+
+
+def test_equal_sentences_are_the_same_object():
+    assert And(A, Or(B, Not(C))) is And(A, Or(B, Not(C)))
+    assert Implication(A, B) is not Biconditional(A, B)
+    assert And(A, B) is not Or(A, B)
+    assert And(A, B) != And(B, A)
+
+
+def test_copies_are_interned():
+    sentence = Biconditional(A, Implication(Not(B), And(A, C)))
+    assert pickle.loads(pickle.dumps(sentence)) is sentence
+    assert copy.deepcopy(sentence) is sentence
+
+
+def test_unused_sentences_are_freed():
+    before = len(Or.interned)
+    for i in range(10 * Sentence.sweep_at):
+        Or(Symbol(f"S{i}"), A)
+    assert len(Or.interned) < before + 2 * Sentence.sweep_at
+    assert len(Symbol.interned) < 4 * Sentence.sweep_at
+
+
+def test_add_returns_a_new_and():
+    knowledge = And(A)
+    added = knowledge.add(B)
+    assert added is And(A, B)
+    assert knowledge.conjuncts == (A,)
+
+
+def test_symbols():
+    sentence = And(A, Or(B, Not(A)), Implication(C, A))
+    assert sentence.symbols() == {"A", "B", "C"}
+    assert And().symbols() == frozenset()
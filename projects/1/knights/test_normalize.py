@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import normalize
+from logic import *
+
+SYMBOLS = [Symbol(name) for name in "ABCD"]
+
+
+def random_sentence(rng, depth):
+    """Returns a random sentence of the symbols, depth connectives deep."""
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(SYMBOLS)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(rng, depth - 1))
+    elif kind in [1, 2]:
+        operands = [random_sentence(rng, depth - 1)
+                    for _ in range(rng.randrange(4))]
+        return And(*operands) if kind == 1 else Or(*operands)
+    elif kind == 3:
+        return Implication(random_sentence(rng, depth - 1),
+                           random_sentence(rng, depth - 1))
+    return Biconditional(random_sentence(rng, depth - 1),
+                         random_sentence(rng, depth - 1))
+
+
+def equivalent(first, second):
+    """Checks that two sentences have the same value in every model."""
+    for values in itertools.product([False, True], repeat=len(SYMBOLS)):
+        model = {symbol.name: value
+                 for symbol, value in zip(SYMBOLS, values)}
+        if first.evaluate(model) != second.evaluate(model):
+            return False
+    return True
+
+
+def test_rewrites_are_equivalent_and_no_larger():
+    rng = random.Random(0)
+    for _ in range(300):
+        sentence = random_sentence(rng, 4)
+        simplified = normalize.simplify(sentence)
+        assert equivalent(sentence, simplified)
+        assert normalize.size(simplified) <= normalize.size(sentence)
+        assert equivalent(sentence, normalize.nnf(sentence))
+        for form in [normalize.cnf, normalize.dnf]:
+            result = form(sentence)
+            if result is not None:
+                assert equivalent(sentence, result)
+
+
+def test_operand_order_does_not_matter():
+    A, B, C = SYMBOLS[:3]
+    simplifier = normalize.Simplifier()
+    first = simplifier.rewrite(And(Or(A, Not(B)), C))
+    second = simplifier.rewrite(And(C, Or(Not(B), A)))
+    assert first is second
+    assert normalize.simplify(Or(And(A, B), And(B, A))) is And(A, B)
+
+
+def test_simplifying_keeps_answers():
+    rng = random.Random(1)
+    for _ in range(50):
+        knowledge = random_sentence(rng, 4)
+        for engine in ["enumerate", "sat"]:
+            assert (model_check_all(knowledge, SYMBOLS, engine)
+                    == model_check_all(knowledge, SYMBOLS, engine,
+                                       simplify=True))
@@ -0,0 +1,33 @@
+import pytest
+
+import truthtable
+from logic import *
+
+SYMBOLS = [Symbol(f"S{i}") for i in range(8)]
+
+
+def chain():
+    """Returns a knowledge base where S0 implies each later symbol."""
+    return And(SYMBOLS[0], *(Implication(first, second)
+                             for first, second in zip(SYMBOLS, SYMBOLS[1:])))
+
+
+def test_use_numpy_without_numpy(monkeypatch):
+    monkeypatch.setattr(truthtable, "numpy", None)
+    with pytest.raises(ImportError):
+        truthtable.entails(chain(), SYMBOLS[-1], use_numpy=True)
+    assert truthtable.entails(chain(), SYMBOLS[-1])
+    assert truthtable.entails(chain(), SYMBOLS[-1], use_numpy=False)
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_blocks_agree_with_model_check(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    knowledge = chain()
+    queries = SYMBOLS + [Not(symbol) for symbol in SYMBOLS]
+    queries.append(Or(Not(SYMBOLS[3]), SYMBOLS[5]))
+    expected = [model_check(knowledge, query) for query in queries]
+    for block_bits in [2, 6, 16]:
+        assert truthtable.entails_all(knowledge, queries, block_bits,
+                                      use_numpy) == expected
@@ -0,0 +1,120 @@
+"""
+Vectorized truth-table checking
+
+Models are checked a block of 2^k at a time. Each symbol is a bitset
+with one bit per model of the block, so a sentence is evaluated in all
+of them by a few bitwise operations. The first k symbols vary within a
+block, and the others are constant across it, all ones or all zeros.
+
+Bitsets are NumPy arrays of 64-bit words when NumPy is installed, and
+Python ints otherwise.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Symbols that vary within a block, which holds 2^BLOCK_BITS models
+BLOCK_BITS = 16
+
+# Bits of the first six symbols within a 64-bit word of models
+WORD_PATTERNS = [
+    0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000,
+]
+
+
+def int_columns(k):
+    """
+    Returns (columns, full) for Python int bitsets of 2^k models, where
+    columns[i] has bit j set for the models j in which symbol i is true.
+    """
+    size = 2 ** k
+    columns = []
+    for i in range(k):
+        half = 2 ** i
+        pattern = ((1 << half) - 1) << half
+        width = 2 * half
+        while width < size:
+            pattern |= pattern << width
+            width *= 2
+        columns.append(pattern)
+    return columns, (1 << size) - 1
+
+
+def numpy_columns(k):
+    """
+    Returns (columns, full) like int_columns, as NumPy arrays of 2^(k-6)
+    words, for k of at least 6.
+    """
+    words = 2 ** (k - 6)
+    full = numpy.full(words, 2 ** 64 - 1, dtype=numpy.uint64)
+    zero = numpy.zeros(words, dtype=numpy.uint64)
+    index = numpy.arange(words, dtype=numpy.uint64)
+    columns = []
+    for i in range(k):
+        if i < 6:
+            columns.append(numpy.full(words, WORD_PATTERNS[i],
+                                      dtype=numpy.uint64))
+        else:
+            bit = (index >> numpy.uint64(i - 6)) & numpy.uint64(1)
+            columns.append(numpy.where(bit == 1, full, zero))
+    return columns, full
+
+
+def all_true(bits, full):
+    if isinstance(bits, int):
+        return bits == full
+    return bool((bits == full).all())
+
+
+def entails(knowledge, query, block_bits=BLOCK_BITS, use_numpy=None):
+    """
+    Checks if knowledge entails query, by evaluating "knowledge implies
+    query" a block of models at a time and stopping at the first block
+    with a model where it is false. Memory is bounded by the block size.
+
+    NumPy is used when installed, unless use_numpy is False, and
+    required if use_numpy is True.
+    """
+    return entails_all(knowledge, [query], block_bits, use_numpy)[0]
+
+
+def entails_all(knowledge, queries, block_bits=BLOCK_BITS, use_numpy=None):
+    """
+    Returns a list of whether knowledge entails each of queries, going
+    over the blocks of models once. Knowledge is evaluated once per
+    block, and each query only until a model of knowledge falsifies it.
+
+    Raises ImportError if use_numpy is True and NumPy is not installed.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError("use_numpy requires NumPy, which is not installed")
+    symbols = sorted(knowledge.symbols().union(
+        *(query.symbols() for query in queries)
+    ))
+    k = min(len(symbols), block_bits)
+    if use_numpy and k >= 6:
+        columns, full = numpy_columns(k)
+    else:
+        columns, full = int_columns(k)
+    zero = full ^ full
+
+    model = dict(zip(symbols, columns))
+    constants = symbols[k:]
+    entailed = set(range(len(queries)))
+    for block in range(2 ** len(constants)):
+        if not entailed:
+            break
+        for i, symbol in enumerate(constants):
+            model[symbol] = full if block >> i & 1 else zero
+
+        # Query must be true wherever knowledge is
+        unknown = knowledge.bits(model, full) ^ full
+        entailed = {i for i in entailed
+                    if all_true(unknown | queries[i].bits(model, full), full)}
+    return [i in entailed for i in range(len(queries))]